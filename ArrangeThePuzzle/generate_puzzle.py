@@ -1,42 +1,123 @@
 from PIL import Image, ImageDraw, ImageFont
+import argparse
+import json
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 
-# Define image dimensions (should match your game window size, e.g., 640x480)
-width, height = 640, 480
-
-# Create a new image with a white background
-img = Image.new("RGB", (width, height), "white")
-draw = ImageDraw.Draw(img)
+# Default image dimensions: the Pinch Puzzle window, so images load without rescaling
+WIDTH, HEIGHT = 800, 600
 
 # Define a list of colors to choose from
-colors = ["red", "green", "blue", "orange", "purple", "cyan", "magenta"]
-
-# Draw a pattern of random colored rectangles
-for i in range(20):
-    # Generate random coordinates and size
-    x1 = random.randint(0, width - 50)
-    y1 = random.randint(0, height - 50)
-    x2 = x1 + random.randint(30, 150)
-    y2 = y1 + random.randint(30, 150)
-    color = random.choice(colors)
-    draw.rectangle([x1, y1, x2, y2], fill=color, outline="black")
-
-# Optionally, add some text to the center
-try:
-    # Attempt to load a truetype font (if available)
-    font = ImageFont.truetype("arial.ttf", 40)
-except IOError:
-    # Fallback to the default PIL font if arial.ttf is not available
-    font = ImageFont.load_default()
-
-text = "Puzzle"
-# Use draw.textbbox to get the text dimensions
-bbox = draw.textbbox((0, 0), text, font=font)
-text_width = bbox[2] - bbox[0]
-text_height = bbox[3] - bbox[1]
-text_position = ((width - text_width) // 2, (height - text_height) // 2)
-draw.text(text_position, text, fill="black", font=font)
-
-# Save the generated image as "puzzle.jpg"
-img.save("puzzle.jpg")
-print("puzzle.jpg has been generated!")
+COLORS = ["red", "green", "blue", "orange", "purple", "cyan", "magenta"]
+
+
+def render_puzzle(seed, width=WIDTH, height=HEIGHT):
+    # Draw one puzzle image; the same seed always gives the same picture
+    rng = random.Random(seed)
+
+    # Create a new image with a white background
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+
+    # Draw a pattern of random colored rectangles, sized relative to a 640x480 layout
+    scale = min(width / 640, height / 480)
+    for i in range(20):
+        # Generate random coordinates and size
+        x1 = rng.randint(0, width - int(50 * scale))
+        y1 = rng.randint(0, height - int(50 * scale))
+        x2 = x1 + int(rng.randint(30, 150) * scale)
+        y2 = y1 + int(rng.randint(30, 150) * scale)
+        color = rng.choice(COLORS)
+        draw.rectangle([x1, y1, x2, y2], fill=color, outline="black")
+
+    # Add some text to the center
+    try:
+        # Attempt to load a truetype font (if available)
+        font = ImageFont.truetype("arial.ttf", int(40 * scale))
+    except IOError:
+        # Fallback to the default PIL font if arial.ttf is not available
+        font = ImageFont.load_default()
+
+    text = "Puzzle"
+    # Use draw.textbbox to get the text dimensions
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+    text_position = ((width - text_width) // 2, (height - text_height) // 2)
+    draw.text(text_position, text, fill="black", font=font)
+    return img
+
+
+def slice_tiles(img, grid, out_dir):
+    # Save the pieces of a grid x grid puzzle as r<row>_c<col>.png, cut the same
+    # way the game cuts them; returns the tile paths relative to out_dir
+    width, height = img.size
+    piece_width, piece_height = width // grid, height // grid
+    os.makedirs(out_dir, exist_ok=True)
+    names = []
+    for row in range(grid):
+        for col in range(grid):
+            box = (col * piece_width, row * piece_height, (col + 1) * piece_width, (row + 1) * piece_height)
+            name = f"r{row}_c{col}.png"
+            img.crop(box).save(os.path.join(out_dir, name))
+            names.append(name)
+    return names
+
+
+def generate_one(seed, out_dir, width=WIDTH, height=HEIGHT, grids=()):
+    # Render and save one puzzle (plus its tiles); returns its manifest entry
+    img = render_puzzle(seed, width, height)
+    name = f"puzzle_{seed}.jpg"
+    img.save(os.path.join(out_dir, name), quality=95)
+    entry = {"seed": seed, "image": name, "width": width, "height": height, "tiles": {}}
+    for grid in grids:
+        tile_dir = os.path.join("tiles", str(seed), f"{grid}x{grid}")
+        slice_tiles(img, grid, os.path.join(out_dir, tile_dir))
+        entry["tiles"][f"{grid}x{grid}"] = tile_dir
+    return entry
+
+
+def generate(seeds, out_dir, width=WIDTH, height=HEIGHT, grids=(), workers=None):
+    # Generate one puzzle per seed across a process pool and write manifest.json.
+    # Output depends only on the seeds, not on the number of workers.
+    os.makedirs(out_dir, exist_ok=True)
+    seeds = list(seeds)
+    grids = tuple(grids)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_one, seed, out_dir, width, height, grids) for seed in seeds]
+        entries = [future.result() for future in futures]
+    manifest = {"width": width, "height": height, "grids": list(grids), "puzzles": entries}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate puzzle images for Pinch Puzzle")
+    parser.add_argument("--seed", type=int, help="seed of the first image (default: random)")
+    parser.add_argument("--count", type=int, default=1, help="number of images, using consecutive seeds")
+    parser.add_argument("--out", metavar="DIR",
+                        help="write a library (images, manifest.json, tiles) to DIR; "
+                             "without it a single puzzle.jpg is written to the current directory")
+    parser.add_argument("--size", type=parse_size, default=(WIDTH, HEIGHT), metavar="WxH",
+                        help=f"image size (default {WIDTH}x{HEIGHT}, the game window)")
+    parser.add_argument("--tiles", type=int, nargs="+", default=(), metavar="N",
+                        help="also save pre-sliced pieces for these NxN grid sizes")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+    width, height = args.size
+    if args.out is None:
+        # Save the generated image as "puzzle.jpg"
+        render_puzzle(seed, width, height).save("puzzle.jpg", quality=95)
+        print(f"puzzle.jpg has been generated! (seed {seed})")
+    else:
+        manifest = generate(range(seed, seed + args.count), args.out, width, height, args.tiles, args.workers)
+        print(f"{len(manifest['puzzles'])} puzzles written to {args.out}")
@@ -0,0 +1,36 @@
+# piece_groups.py
+
+class PieceGroups:
+    # Union-find over piece indices (row * cols + col).
+    # Pieces that were snapped together share a root; the root also owns the
+    # list of its members so a whole cluster can be moved without searching
+    # for it. Members of the smaller cluster are appended to the larger one.
+    def __init__(self, count):
+        self.parent = list(range(count))
+        self.members = [[i] for i in range(count)]  # only meaningful for roots
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # path halving
+            i = parent[i]
+        return i
+
+    def same(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def group(self, i):
+        # Indices of every piece in i's cluster (including i).
+        return self.members[self.find(i)]
+
+    def union(self, a, b):
+        # Merge the clusters of a and b; returns the root of the merged cluster.
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if len(self.members[root_a]) < len(self.members[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.members[root_a].extend(self.members[root_b])
+        self.members[root_b] = []
+        return root_a
@@ -1,45 +1,117 @@
-import cv2
-import mediapipe as mp
 import pygame
+import argparse
+import os
 import sys
 import random
-import numpy as np
 import time
 
+# Make the shared helpers at the repository root importable.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+from shared.startup import LazyHands, StartupReport
+from shared.pipeline import GesturePipeline, camera_opener
+from shared.replay import LandmarkRecorder, LockstepClock, ReplayPipeline, add_input_arguments, seed_random
+from shared.inference import ProcessDetector
+from shared.preview import PreviewRenderer
+from shared.profiler import FrameProfiler, add_profiler_arguments
+from shared.spatial import SpatialGrid
+from shared.text import TextCache
+from shared.idle import run_static_screen
+from shared.filters import GestureFilter
+from piece_groups import PieceGroups
+
 # -------------------- SETUP: Mediapipe Hand Detection --------------------
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
-mp_draw = mp.solutions.drawing_utils
+# Loaded and warmed up by the gesture pipeline in the background, not at import
+hands = LazyHands(max_num_hands=1, min_detection_confidence=0.7)
+
+# Supported puzzle sizes (pieces per side)
+MIN_GRID = 2
+MAX_GRID = 50
+
+# How close (in pixels) a piece must be dropped to its target or to a matching neighbour to snap
+SNAP_DISTANCE = 20
+# Grid offsets (row, col) of a piece's four neighbours
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Draw order of the sprites in the dirty-rect renderer
+PIECE_LAYER = 0
+PREVIEW_LAYER = 1
+INDICATOR_LAYER = 2
 
 # -------------------- PUZZLE PIECE CLASS --------------------
-class PuzzlePiece(pygame.sprite.Sprite):
-    def __init__(self, image, target_pos, init_pos):
+# Pieces are DirtySprites: the renderer only repaints them (and what they
+# uncover) on frames where they were marked dirty.
+class PuzzlePiece(pygame.sprite.DirtySprite):
+    def __init__(self, image, target_pos, init_pos, row=0, col=0, index=0):
         super().__init__()
         self.image = image
         self.rect = self.image.get_rect(topleft=init_pos)
         self.target_pos = target_pos
+        self.row, self.col, self.index = row, col, index
         self.placed = False
+        self.z = 0  # stacking order among the loose pieces; higher is on top
+
+    def move_to(self, topleft):
+        if self.rect.topleft != topleft:
+            self.rect.topleft = topleft
+            self.dirty = 1
+
+    def snap_offset(self):
+        # Offset that would move the piece onto its target, if it is close enough to snap
+        tx, ty = self.target_pos
+        dx, dy = tx - self.rect.x, ty - self.rect.y
+        if abs(dx) < SNAP_DISTANCE and abs(dy) < SNAP_DISTANCE:
+            return dx, dy
+        return None
 
-    def update(self):
-        # If the piece is within 20 pixels of its target, snap it in place
-        if not self.placed:
-            tx, ty = self.target_pos
-            if abs(self.rect.x - tx) < 20 and abs(self.rect.y - ty) < 20:
-                self.rect.topleft = self.target_pos
-                self.placed = True
+# Red circle drawn at the finger position while pinching
+class FingerIndicator(pygame.sprite.DirtySprite):
+    def __init__(self, radius=10):
+        super().__init__()
+        self.image = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(self.image, (255, 0, 0), (radius, radius), radius)
+        self.rect = self.image.get_rect()
+        self.visible = 0
+
+    def show(self, pos):
+        if not self.visible or self.rect.center != pos:
+            self.rect.center = pos
+            self.visible = 1
+            self.dirty = 1
+
+    def hide(self):
+        if self.visible:
+            self.visible = 0
+
+# Camera thumbnail; marked dirty only when the preview surface was refreshed
+class PreviewSprite(pygame.sprite.DirtySprite):
+    def __init__(self, preview, pos):
+        super().__init__()
+        self.preview = preview
+        self.image = preview.surface
+        self.rect = self.image.get_rect(topleft=pos)
+        self.visible = 0
 
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
+    def update(self, state):
+        if self.preview.update(state.frame, state.results.multi_hand_landmarks, state.seq):
+            self.visible = 1
+            self.dirty = 1
 
 # -------------------- GAME CLASS WITH MULTIPLE STATES --------------------
 class PinchPuzzleDeluxe:
-    def __init__(self):
+    def __init__(self, record=None, replay=None, realtime=True, profile=False, profile_out=None,
+                 dirty_rects=True, grid=3, image="puzzle.jpg", inference_process=False):
         # Initialize Pygame
         pygame.init()
         self.width, self.height = 800, 600  # Increased resolution for better visuals
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Pinch Puzzle Deluxe")
-        self.clock = pygame.time.Clock()
+        # A --fast replay runs unthrottled
+        self.clock = LockstepClock() if replay and not realtime else pygame.time.Clock()
+
+        # Fonts for the menu and win screens
+        self.font_large = pygame.font.SysFont("Arial", 48)
+        self.font_small = pygame.font.SysFont("Arial", 32)
+        self.text = TextCache()  # rendered menu text
 
         # Define game states: MENU, GAME, and WIN
         self.state = "MENU"
@@ -52,71 +124,212 @@ class PinchPuzzleDeluxe:
         except Exception as e:
             print("Background image not found, using solid background color.")
             self.background = None
+        # What the renderer paints behind the sprites; placed pieces are baked into it
+        self.backdrop = pygame.Surface((self.width, self.height)).convert()
 
-        # Load the puzzle image (or generate a placeholder if not found)
+        # Load the puzzle image (or generate a placeholder if not found); images
+        # made by generate_puzzle.py are already window-sized and skip the rescale
         try:
-            self.puzzle_image = pygame.image.load("puzzle.jpg")
-            self.puzzle_image = pygame.transform.scale(self.puzzle_image, (self.width, self.height))
+            self.puzzle_image = pygame.image.load(image)
+            if self.puzzle_image.get_size() != (self.width, self.height):
+                self.puzzle_image = pygame.transform.scale(self.puzzle_image, (self.width, self.height))
+            self.puzzle_image = self.puzzle_image.convert()
         except Exception as e:
             print("Puzzle image not found, generating a placeholder.")
             self.puzzle_image = pygame.Surface((self.width, self.height))
             self.puzzle_image.fill((200, 200, 200))
 
-        # Puzzle configuration: create a 3x3 grid for extra challenge
-        self.rows = 3
-        self.cols = 3
-        self.piece_width = self.width // self.cols
-        self.piece_height = self.height // self.rows
+        # Only the regions that changed since the last frame are redrawn and
+        # sent to the display, unless dirty_rects is off; full repaints still
+        # happen when entering the game and while the profiler overlay is up
+        self.dirty_rects = dirty_rects
+        self.repaint = True
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.sprites.clear(self.screen, self.backdrop)
 
-        # Create a sprite group to hold all puzzle pieces
+        # Create a sprite group to hold all puzzle pieces, and an index of the
+        # loose ones for finding the piece under the finger
         self.pieces = pygame.sprite.Group()
-        self.create_puzzle_pieces()
+        self.piece_list = []
+        self.groups = PieceGroups(0)
+        self.piece_grid = SpatialGrid()
+        self.placed_count = 0
+        self.top_z = 0
+
+        # Puzzle configuration: a grid x grid puzzle, 3x3 by default
+        self.set_grid(grid)
 
-        # Setup the camera (make sure your webcam is available)
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Setup the camera (make sure your webcam is available); capture and
+        # hand tracking run on background threads so rendering never waits on them
+        self.detector = None
+        if replay:
+            # Play back a landmark recording instead of using the webcam
+            self.pipeline = ReplayPipeline(replay, (self.width, self.height), realtime=realtime,
+                                           frame_size=(self.width, self.height))
+        else:
+            recorder = LandmarkRecorder(record) if record else None
+            detect, reset, warm_up = self.get_hand_landmarks, hands.reset, hands.warm_up
+            if inference_process:
+                # Run Mediapipe in a worker process, off this interpreter's GIL
+                self.detector = ProcessDetector(frame_shape=(self.height, self.width, 3))
+                detect, reset, warm_up = self.detector, self.detector.reset, self.detector.warm_up
+            # The camera is opened and Mediapipe loaded on the pipeline's
+            # threads, so the menu shows up without waiting for either
+            self.pipeline = GesturePipeline(camera_opener(0, self.width, self.height),
+                                            detect, (self.width, self.height),
+                                            recorder=recorder, reset=reset, warm_up=warm_up)
+        self.pipeline.start()
+        # Reports time to the first frame and to hand tracking being ready
+        self.startup = StartupReport(self.pipeline)
+        # Smoothed, latency-compensated fingertip and pinch state with hysteresis
+        self.input_filter = GestureFilter((0, 0))
+        # Per-stage frame timings; F3 toggles the overlay
+        self.profiler = FrameProfiler(enabled=profile, export_path=profile_out)
+        # Camera thumbnail with the hand skeleton, refreshed at a lower rate than the game
+        self.preview = PreviewRenderer((160, 120), fps=15)
+        self.preview_sprite = PreviewSprite(self.preview, (self.width - 170, 10))
+        self.indicator = FingerIndicator()
+        self.sprites.add(self.preview_sprite, layer=PREVIEW_LAYER)
+        self.sprites.add(self.indicator, layer=INDICATOR_LAYER)
 
         # Variables to track gesture and piece dragging
         self.grabbed_piece = None
+        self.grabbed_group = []
         self.pinch_active = False
 
+    def set_grid(self, size):
+        # Switch to a size x size puzzle and deal out new pieces
+        if not MIN_GRID <= size <= MAX_GRID:
+            raise ValueError(f"grid size must be between {MIN_GRID} and {MAX_GRID}, got {size}")
+        self.rows = self.cols = size
+        self.piece_width = self.width // self.cols
+        self.piece_height = self.height // self.rows
+        self.create_puzzle_pieces()
+
     def create_puzzle_pieces(self):
         # Clear any existing pieces and split the puzzle image into pieces
+        self.sprites.remove(self.pieces)
         self.pieces.empty()
+        self.piece_list = []
+        self.groups = PieceGroups(self.rows * self.cols)
+        self.reset_backdrop()
+        # Hit-test cells about one piece across, so a point query sees only a few pieces
+        self.piece_grid = SpatialGrid(cell_size=max(self.piece_width, self.piece_height))
+        self.placed_count = 0
+        self.top_z = 0
+        self.grabbed_piece = None
+        self.grabbed_group = []
         for i in range(self.rows):
             for j in range(self.cols):
-                # Define the rectangle for this piece
+                # Each piece is a view into the puzzle image rather than a copy
                 rect = pygame.Rect(j * self.piece_width, i * self.piece_height, self.piece_width, self.piece_height)
-                piece_image = pygame.Surface((self.piece_width, self.piece_height))
-                piece_image.blit(self.puzzle_image, (0, 0), rect)
+                piece_image = self.puzzle_image.subsurface(rect)
                 target_pos = (j * self.piece_width, i * self.piece_height)
                 # Randomize the starting position within screen bounds
                 init_x = random.randint(0, self.width - self.piece_width)
                 init_y = random.randint(0, self.height - self.piece_height)
-                piece = PuzzlePiece(piece_image, target_pos, (init_x, init_y))
+                piece = PuzzlePiece(piece_image, target_pos, (init_x, init_y), i, j, len(self.piece_list))
+                self.piece_list.append(piece)
+                self.top_z += 1
+                piece.z = self.top_z
                 self.pieces.add(piece)
+                self.sprites.add(piece, layer=PIECE_LAYER)
+                self.piece_grid.insert(piece)
+        self.repaint = True
+
+    def reset_backdrop(self):
+        if self.background:
+            self.backdrop.blit(self.background, (0, 0))
+        else:
+            self.backdrop.fill((30, 30, 30))
+
+    def piece_at(self, pos):
+        # Topmost loose piece under pos, or None
+        hits = self.piece_grid.query_point(pos)
+        return max(hits, key=lambda piece: piece.z) if hits else None
+
+    def raise_piece(self, piece):
+        # Put a piece on top of the other loose pieces
+        self.top_z += 1
+        piece.z = self.top_z
+        self.sprites.remove(piece)
+        self.sprites.add(piece, layer=PIECE_LAYER)
+        piece.dirty = 1
+
+    def group_of(self, piece):
+        # Every piece in the cluster that piece belongs to
+        return [self.piece_list[i] for i in self.groups.group(piece.index)]
+
+    def grab_piece(self, piece):
+        # Pick up a piece together with its cluster
+        group = self.group_of(piece)
+        for member in group:
+            self.raise_piece(member)
+        self.grabbed_piece = piece
+        self.grabbed_group = group
+
+    def shift_group(self, group, dx, dy):
+        # Move a whole cluster by one offset
+        if not dx and not dy:
+            return
+        for member in group:
+            member.move_to((member.rect.x + dx, member.rect.y + dy))
+            self.piece_grid.move(member)
+
+    def join_neighbours(self, group):
+        # Merge a dropped cluster with loose neighbours lying next to it, as
+        # they would in the finished picture. Only the grid neighbours of the
+        # dropped pieces are checked. The first match pulls the dropped
+        # cluster into alignment; later matches pull the neighbour's cluster
+        # to it instead, so everything that joins stays exactly aligned.
+        aligned = False
+        for member in group:
+            for dr, dc in NEIGHBOURS:
+                row, col = member.row + dr, member.col + dc
+                if not (0 <= row < self.rows and 0 <= col < self.cols):
+                    continue
+                other = self.piece_list[row * self.cols + col]
+                if other.placed or self.groups.same(member.index, other.index):
+                    continue
+                # How far the neighbour is from where it belongs next to this piece
+                dx = other.rect.x - dc * self.piece_width - member.rect.x
+                dy = other.rect.y - dr * self.piece_height - member.rect.y
+                if abs(dx) >= SNAP_DISTANCE or abs(dy) >= SNAP_DISTANCE:
+                    continue
+                if aligned:
+                    self.shift_group(self.group_of(other), -dx, -dy)
+                else:
+                    self.shift_group(group, dx, dy)
+                    aligned = True
+                self.groups.union(member.index, other.index)
+
+    def release_piece(self, piece):
+        # Drop the grabbed cluster: join it to matching neighbours, then snap
+        # it to the target if close enough. Placed pieces become part of the
+        # backdrop and leave the sprite group and the hit-test index.
+        self.join_neighbours(self.grabbed_group)
+        offset = piece.snap_offset()
+        if offset is None:
+            return
+        group = self.group_of(piece)
+        for member in group:
+            self.sprites.repaint_rect(member.rect)
+        self.shift_group(group, *offset)
+        for member in group:
+            member.placed = True
+            self.piece_grid.remove(member)
+            self.sprites.remove(member)
+            self.backdrop.blit(member.image, member.rect)
+            self.sprites.repaint_rect(member.rect)
+        self.placed_count += len(group)
 
     def get_hand_landmarks(self, frame):
         # Convert frame to RGB for Mediapipe processing
+        import cv2  # loaded on the inference thread, not at startup
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = hands.process(frame_rgb)
         return results
 
-    def get_pinch_status(self, landmarks):
-        # Use Mediapipe landmarks to detect pinch (thumb tip and index finger tip)
-        if landmarks:
-            thumb_tip = landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-            index_tip = landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            # Calculate Euclidean distance between the two points
-            x1, y1 = thumb_tip.x, thumb_tip.y
-            x2, y2 = index_tip.x, index_tip.y
-            dist = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            # Convert the index tip to screen coordinates
-            finger_pos = (int(index_tip.x * self.width), int(index_tip.y * self.height))
-            return dist, finger_pos
-        return None, (0, 0)
-
     def run(self):
         # Main loop that switches between menu, game, and win states
         while True:
@@ -126,127 +339,157 @@ class PinchPuzzleDeluxe:
                 self.game_loop()
             elif self.state == "WIN":
                 self.win_loop()
+            elif self.state == "QUIT":
+                self.cleanup()
             else:
                 break
 
     def menu_loop(self):
-        # Main menu screen
-        font_title = pygame.font.SysFont("Arial", 48)
-        font_instr = pygame.font.SysFont("Arial", 32)
-        title_text = font_title.render("Pinch Puzzle Deluxe", True, (255, 255, 255))
-        instr_text = font_instr.render("Press ENTER to Start", True, (255, 255, 255))
-        while self.state == "MENU":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.state = "GAME"
-            self.screen.fill((0, 0, 0))
-            self.screen.blit(title_text, ((self.width - title_text.get_width()) // 2, self.height // 3))
-            self.screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
-            pygame.display.flip()
-            self.clock.tick(30)
+        # Main menu screen; camera and tracking are paused and the screen is
+        # only redrawn when input arrives (or on the idle refresh timer)
+        self.pipeline.pause()
+        run_static_screen(self.draw_menu, self.handle_menu_event, lambda: self.state == "MENU",
+                          presented=self.startup.presented)
+
+    def draw_menu(self, screen):
+        title_text = self.text.render(self.font_large, "Pinch Puzzle Deluxe", True, (255, 255, 255))
+        instr_text = self.text.render(self.font_small, "Press ENTER to Start", True, (255, 255, 255))
+        screen.fill((0, 0, 0))
+        screen.blit(title_text, ((self.width - title_text.get_width()) // 2, self.height // 3))
+        screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
+
+    def handle_menu_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.state = "GAME"
 
     def game_loop(self):
-        # Main game loop
+        # Main game loop; the menu drew over the whole screen
+        self.repaint = True
+        self.pipeline.resume()
         while self.state == "GAME":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-
-            # Capture frame from the webcam
-            ret, frame = self.cap.read()
-            if not ret:
-                continue
-            frame = cv2.flip(frame, 1)
-            results = self.get_hand_landmarks(frame)
-            pinch_distance, finger_pos = None, (0, 0)
-            if results.multi_hand_landmarks:
-                for handLms in results.multi_hand_landmarks:
-                    pinch_distance, finger_pos = self.get_pinch_status(handLms)
-                    # (Optional) Draw hand landmarks on the frame for debugging:
-                    mp_draw.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
-
-            # Check pinch status based on a threshold (tweak as needed)
-            if pinch_distance is not None and pinch_distance < 0.05:
-                self.pinch_active = True
-            else:
-                self.pinch_active = False
-                self.grabbed_piece = None  # release piece if pinch is not active
-
-            # Handle dragging of puzzle pieces using pinch gesture
-            if self.pinch_active:
-                if self.grabbed_piece is None:
-                    for piece in self.pieces:
-                        if not piece.placed and piece.rect.collidepoint(finger_pos):
-                            self.grabbed_piece = piece
-                            break
-                if self.grabbed_piece is not None:
-                    # Move the piece to follow the finger (centering the piece)
-                    self.grabbed_piece.rect.topleft = (finger_pos[0] - self.piece_width // 2,
-                                                       finger_pos[1] - self.piece_height // 2)
-            else:
-                if self.grabbed_piece is not None:
-                    # When the pinch is released, snap the piece into place if near its target
-                    self.grabbed_piece.update()
-                    self.grabbed_piece = None
-
-            # Check if all pieces have been placed correctly
-            if all(piece.placed for piece in self.pieces):
-                self.state = "WIN"
-
-            # -------------------- RENDERING --------------------
-            # Draw the background
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((30, 30, 30))
+            self.game_frame()
+
+    def game_frame(self):
+        # Run one frame of the puzzle: input, dragging and rendering
+        profiler = self.profiler
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.cleanup()
+            profiler.handle_event(event)
+
+        # Read the latest gesture input without waiting on the camera
+        state = self.pipeline.latest()
+        self.pinch_active, finger_pos = self.input_filter.update(state, predict=self.pipeline.realtime)
+        profiler.add_pipeline(self.pipeline)
+        profiler.add("latency", self.input_filter.latency)
+        profiler.mark("input")
 
-            # Draw puzzle pieces
-            for piece in self.pieces:
-                piece.draw(self.screen)
+        # Handle dragging of puzzle pieces using pinch gesture
+        if self.pinch_active:
+            if self.grabbed_piece is None:
+                piece = self.piece_at(finger_pos)
+                if piece is not None:
+                    self.grab_piece(piece)
+            if self.grabbed_piece is not None:
+                # Move the piece to follow the finger (centering the piece); its cluster moves with it
+                rect = self.grabbed_piece.rect
+                self.shift_group(self.grabbed_group,
+                                 finger_pos[0] - self.piece_width // 2 - rect.x,
+                                 finger_pos[1] - self.piece_height // 2 - rect.y)
+        elif self.grabbed_piece is not None:
+            # When the pinch is released, join neighbours and snap into place if near the target
+            self.release_piece(self.grabbed_piece)
+            self.grabbed_piece = None
+            self.grabbed_group = []
 
-            # Optionally, display a thumbnail of the camera feed in the corner
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(np.rot90(frame_rgb))
-            thumb = pygame.transform.scale(frame_surface, (160, 120))
-            self.screen.blit(thumb, (self.width - 170, 10))
+        # Check if all pieces have been placed correctly
+        if self.placed_count == len(self.pieces):
+            self.state = "WIN"
+        profiler.mark("simulation")
 
-            # Draw a visual indicator (a red circle) at the finger position when pinching
-            if self.pinch_active:
-                pygame.draw.circle(self.screen, (255, 0, 0), finger_pos, 10)
+        # -------------------- RENDERING --------------------
+        # Optionally, display a thumbnail of the camera feed in the corner
+        if state is not None:
+            self.preview_sprite.update(state)
 
+        # Draw a visual indicator (a red circle) at the finger position when pinching
+        if self.pinch_active:
+            self.indicator.show(finger_pos)
+        else:
+            self.indicator.hide()
+
+        # The profiler overlay is drawn straight onto the screen, so repaint
+        # everything while it is shown and once more after it is hidden
+        full = not self.dirty_rects or self.repaint or profiler.show_overlay
+        self.repaint = profiler.show_overlay
+        if full:
+            self.sprites.repaint_rect(self.screen.get_rect())
+        rects = self.sprites.draw(self.screen)
+        profiler.draw(self.screen)
+        profiler.mark("render")
+
+        if full:
             pygame.display.flip()
-            self.clock.tick(30)
+        elif rects:
+            pygame.display.update(rects)
+        self.startup.presented()
+        profiler.mark("flip")
+        profiler.end_frame()
+        self.clock.tick(30)
 
     def win_loop(self):
         # Win screen when puzzle is complete
-        font_win = pygame.font.SysFont("Arial", 48)
-        font_instr = pygame.font.SysFont("Arial", 32)
-        win_text = font_win.render("You Win!", True, (255, 255, 0))
-        instr_text = font_instr.render("Press ENTER for Menu", True, (255, 255, 255))
-        while self.state == "WIN":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        # Reset puzzle pieces for a new game
-                        self.create_puzzle_pieces()
-                        self.state = "MENU"
-            self.screen.fill((0, 0, 0))
-            self.screen.blit(win_text, ((self.width - win_text.get_width()) // 2, self.height // 3))
-            self.screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
-            pygame.display.flip()
-            self.clock.tick(30)
+        self.pipeline.pause()
+        run_static_screen(self.draw_win, self.handle_win_event, lambda: self.state == "WIN")
+
+    def draw_win(self, screen):
+        win_text = self.text.render(self.font_large, "You Win!", True, (255, 255, 0))
+        instr_text = self.text.render(self.font_small, "Press ENTER for Menu", True, (255, 255, 255))
+        screen.fill((0, 0, 0))
+        screen.blit(win_text, ((self.width - win_text.get_width()) // 2, self.height // 3))
+        screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
+
+    def handle_win_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                # Reset puzzle pieces for a new game
+                self.create_puzzle_pieces()
+                self.state = "MENU"
 
     def cleanup(self):
-        self.cap.release()
+        self.pipeline.stop()
+        if self.detector is not None:
+            self.detector.close()
+        self.profiler.close()
         pygame.quit()
         sys.exit()
 
 # -------------------- ENTRY POINT --------------------
 if __name__ == "__main__":
-    game = PinchPuzzleDeluxe()
+    parser = argparse.ArgumentParser(description="Pinch Puzzle Deluxe")
+    add_input_arguments(parser)
+    add_profiler_arguments(parser)
+    parser.add_argument("--image", default="puzzle.jpg", help="puzzle image to play (default puzzle.jpg)")
+    parser.add_argument("--grid", type=int, default=3,
+                        help=f"pieces per side of the puzzle ({MIN_GRID}-{MAX_GRID}, default 3)")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="redraw and present the whole screen every frame instead of only changed regions")
+    args = parser.parse_args()
+    if not MIN_GRID <= args.grid <= MAX_GRID:
+        parser.error(f"--grid must be between {MIN_GRID} and {MAX_GRID}")
+    seed_random(args)
+    game = PinchPuzzleDeluxe(record=args.record, replay=args.replay, realtime=not args.fast,
+                             profile=args.profile, profile_out=args.profile_out,
+                             dirty_rects=not args.full_redraw, grid=args.grid, image=args.image,
+                             inference_process=args.inference_process)
     game.run()
@@ -5,14 +5,54 @@ import os
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 
-# World dimensions (in pixels)
+# World dimensions (in pixels). Set both to None for an unbounded world that
+# is generated around the player as it explores.
 WORLD_WIDTH = 2000
 WORLD_HEIGHT = 2000
+WORLD_BOUNDED = WORLD_WIDTH is not None and WORLD_HEIGHT is not None
 
 # Tile configuration
 TILE_SIZE = 64
-TILES_X = WORLD_WIDTH // TILE_SIZE
-TILES_Y = WORLD_HEIGHT // TILE_SIZE
+TILES_X = WORLD_WIDTH // TILE_SIZE if WORLD_BOUNDED else None
+TILES_Y = WORLD_HEIGHT // TILE_SIZE if WORLD_BOUNDED else None
+
+# Tiles come from a seeded noise function, so the same seed always gives the
+# same map and any chunk can be regenerated after it was evicted.
+WORLD_SEED = 1337
+NOISE_SCALE = 6  # tiles between noise lattice points; larger gives bigger lakes and rock fields
+
+# The world is generated and pre-rendered in square chunks of CHUNK_TILES x
+# CHUNK_TILES tiles. At most CHUNK_CACHE chunks are kept (least recently used
+# are dropped); chunks the camera will reach within PREFETCH_TIME seconds at
+# the player's current velocity are built ahead of time, PREFETCH_PER_FRAME
+# per frame.
+CHUNK_TILES = 8
+CHUNK_CACHE = 64
+PREFETCH_TIME = 0.75
+PREFETCH_PER_FRAME = 1
+
+# Enemies path around water and stone along a flow field computed over the
+# tiles within FLOW_RADIUS of the player (further away they head straight for it).
+FLOW_FIELD = True
+FLOW_RADIUS = 24
+# A rebuild is spread over several simulation steps, growing the search by
+# FLOW_STEPS rings per step; enemies follow the previous field meanwhile.
+FLOW_STEPS = 8
+
+# In an unbounded world, where there is no edge to leave, projectiles are removed
+# after flying this far. A bounded world removes them at its edge instead.
+PROJECTILE_RANGE = 1500
+
+# Fixed simulation timestep. Movement speeds are in pixels per second; the game
+# runs as many SIM_DT steps per frame as the elapsed time requires, up to
+# MAX_SIM_STEPS, and interpolates between the last two steps when drawing.
+SIM_RATE = 60
+SIM_DT = 1.0 / SIM_RATE
+MAX_SIM_STEPS = 8
+
+# Keep enemies in NumPy arrays (engine/enemy_store.py) instead of one sprite each.
+# Worth enabling for wave sizes in the thousands.
+ENEMY_STORE = False
 
 # Colors (RGB tuples)
 WHITE  = (255, 255, 255)
@@ -23,6 +63,9 @@ GREEN  = (0, 255, 0)
 BLUE   = (0, 0, 255)
 YELLOW = (255, 255, 0)
 
+# Sprite colour of each local player (one tracked hand per player).
+PLAYER_COLORS = (BLUE, YELLOW)
+
 # Tile types
 TILE_GRASS = 0
 TILE_WATER = 1
@@ -1,6 +1,6 @@
 # engine/camera.py
 import pygame
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WORLD_BOUNDED
 
 class Camera:
     def __init__(self):
@@ -9,9 +9,10 @@ class Camera:
         self.offset = pygame.Vector2(0, 0)
 
     def update(self, target_rect):
-        # Center the camera on the target while clamping to world bounds.
+        # Center the camera on the target, clamping to the world bounds if it has any.
         x = target_rect.centerx - self.width // 2
         y = target_rect.centery - self.height // 2
-        x = max(0, min(x, WORLD_WIDTH - self.width))
-        y = max(0, min(y, WORLD_HEIGHT - self.height))
+        if WORLD_BOUNDED:
+            x = max(0, min(x, WORLD_WIDTH - self.width))
+            y = max(0, min(y, WORLD_HEIGHT - self.height))
         self.offset = pygame.Vector2(x, y)
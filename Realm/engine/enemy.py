@@ -2,26 +2,43 @@
 import pygame
 import random
 from config import RED
+from engine.entity import Entity
+from shared.pool import SpritePool, shared_image
 
-class Enemy(pygame.sprite.Sprite):
+def _enemy_image():
+    # Create a square enemy.
+    image = pygame.Surface((40, 40))
+    image.fill(RED)
+    return image
+
+class Enemy(Entity):
     def __init__(self, pos):
-        super().__init__()
-        # Create a square enemy.
-        self.image = pygame.Surface((40, 40))
-        self.image.fill(RED)
-        self.rect = self.image.get_rect(center=pos)
-        self.speed = random.randint(1, 3)
+        super().__init__(shared_image("realm.enemy", _enemy_image), pos)
+        self.reset(pos)
+
+    def reset(self, pos):
+        self.place(pos)
+        self.speed = random.randint(1, 3) * 60  # pixels per second
         self.health = 50
 
-    def update(self, player_rect):
-        # Move toward the player.
-        direction = pygame.Vector2(player_rect.center) - pygame.Vector2(self.rect.center)
-        if direction.length() != 0:
-            direction = direction.normalize() * self.speed
-        self.rect.centerx += int(direction.x)
-        self.rect.centery += int(direction.y)
+    def update(self, targets, dt, flow_field=None):
+        # Move toward the nearest of the target points (the players' centers),
+        # following the flow field where it has a heading.
+        self.begin_step()
+        heading = flow_field.direction_at(self.pos) if flow_field is not None else None
+        if heading is not None:
+            self.pos += pygame.Vector2(heading[0], heading[1]) * (self.speed * dt)
+        else:
+            target = min(targets, key=self.pos.distance_squared_to)
+            direction = pygame.Vector2(target) - self.pos
+            if direction.length() != 0:
+                self.pos += direction.normalize() * (self.speed * dt)
+        self.sync_rect()
 
     def take_damage(self, amount):
         self.health -= amount
         if self.health <= 0:
             self.kill()
+
+# Killed enemies are recycled through this pool.
+enemy_pool = SpritePool(Enemy)
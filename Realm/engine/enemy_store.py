@@ -0,0 +1,116 @@
+# engine/enemy_store.py
+import random
+import numpy as np
+import pygame
+from config import RED
+
+ENEMY_SIZE = 40
+ENEMY_HEALTH = 50
+
+class EnemyStore:
+    # Array-backed alternative to a group of Enemy sprites.
+    # Positions (centers, before and after the last simulation step), speeds
+    # and health live in contiguous NumPy arrays; only the first `count` rows
+    # are live. Steering, damage and deaths are each one vectorized step, and
+    # sprites are only involved at draw time, where every enemy shares one
+    # image and is drawn with a single blits() call.
+    def __init__(self, capacity=256):
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.prev_pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.health = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+        self.image = pygame.Surface((ENEMY_SIZE, ENEMY_SIZE))
+        self.image.fill(RED)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _grow(self):
+        capacity = len(self.speed) * 2
+        for name in ("pos", "prev_pos", "speed", "health"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, pos, speed=None):
+        if self.count == len(self.speed):
+            self._grow()
+        i = self.count
+        self.pos[i] = pos
+        self.prev_pos[i] = pos
+        self.speed[i] = random.randint(1, 3) * 60 if speed is None else speed  # pixels per second
+        self.health[i] = ENEMY_HEALTH
+        self.count += 1
+
+    def update(self, targets, dt, flow_field=None):
+        # Move every enemy toward the nearest of the target points by its speed
+        # over dt seconds, along the flow field's headings where it has one.
+        n = self.count
+        self.prev_pos[:n] = self.pos[:n]
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        deltas = targets[None, :, :] - self.pos[:n, None, :]
+        nearest = (deltas ** 2).sum(axis=2).argmin(axis=1)
+        delta = deltas[np.arange(n), nearest]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        moving = dist > 0
+        scale = np.zeros(n)
+        scale[moving] = self.speed[:n][moving] * dt / dist[moving]
+        step = delta * scale[:, None]
+        if flow_field is not None:
+            headings = flow_field.directions_at(self.pos[:n])
+            guided = headings.any(axis=1)
+            step[guided] = headings[guided] * (self.speed[:n][guided] * dt)[:, None]
+        self.pos[:n] += step
+
+    def overlaps(self, rects):
+        # Boolean (len(rects), count) matrix: does rect i overlap enemy j?
+        n = self.count
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        half = ENEMY_SIZE / 2
+        left = self.pos[:n, 0] - half
+        top = self.pos[:n, 1] - half
+        rx, ry = rects[:, 0:1], rects[:, 1:2]
+        rw, rh = rects[:, 2:3], rects[:, 3:4]
+        return ((left < rx + rw) & (rx < left + ENEMY_SIZE) &
+                (top < ry + rh) & (ry < top + ENEMY_SIZE))
+
+    def apply_damage(self, amounts):
+        # Subtract per-enemy damage and remove the dead; returns how many died.
+        n = self.count
+        self.health[:n] -= amounts
+        dead = self.health[:n] <= 0
+        killed = int(dead.sum())
+        if killed:
+            self.remove(dead)
+        return killed
+
+    def remove(self, mask):
+        # Compact the live rows, dropping those where mask is True.
+        n = self.count
+        keep = ~mask
+        k = int(keep.sum())
+        self.pos[:k] = self.pos[:n][keep]
+        self.prev_pos[:k] = self.prev_pos[:n][keep]
+        self.speed[:k] = self.speed[:n][keep]
+        self.health[:k] = self.health[:n][keep]
+        self.count = k
+
+    def draw(self, surface, camera_offset, alpha=1.0):
+        # alpha blends between the previous and current simulation step.
+        n = self.count
+        if n == 0:
+            return
+        center = self.prev_pos[:n] + (self.pos[:n] - self.prev_pos[:n]) * alpha
+        topleft = center - ENEMY_SIZE / 2 - (camera_offset.x, camera_offset.y)
+        # Skip enemies that are entirely off screen.
+        width, height = surface.get_size()
+        visible = ((topleft[:, 0] > -ENEMY_SIZE) & (topleft[:, 0] < width) &
+                   (topleft[:, 1] > -ENEMY_SIZE) & (topleft[:, 1] < height))
+        image = self.image
+        surface.blits([(image, p) for p in topleft[visible].astype(np.int32).tolist()], doreturn=False)
@@ -0,0 +1,33 @@
+# engine/entity.py
+import pygame
+from shared.pool import PooledSprite
+
+class Entity(PooledSprite):
+    # Sprite with a float position for the fixed-timestep simulation.
+    # pos is the center after the latest simulation step and prev_pos the center
+    # before it; rect is kept in sync with pos for collisions. Rendering blends
+    # the two so movement stays smooth between steps.
+    def __init__(self, image, pos):
+        super().__init__()
+        self.image = image
+        self.rect = self.image.get_rect(center=pos)
+        self.pos = pygame.Vector2(pos)
+        self.prev_pos = pygame.Vector2(pos)
+
+    def place(self, pos):
+        # Move to pos without interpolating from the old position (used when recycling).
+        self.pos.update(pos)
+        self.prev_pos.update(pos)
+        self.sync_rect()
+
+    def begin_step(self):
+        self.prev_pos.update(self.pos)
+
+    def sync_rect(self):
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
+
+    def render_topleft(self, alpha, camera_offset):
+        # Screen position interpolated between the last two simulation steps.
+        center = self.prev_pos.lerp(self.pos, alpha)
+        return (round(center.x - self.rect.width / 2 - camera_offset.x),
+                round(center.y - self.rect.height / 2 - camera_offset.y))
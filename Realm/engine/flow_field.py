@@ -0,0 +1,154 @@
+# engine/flow_field.py
+import numpy as np
+from config import TILE_SIZE, TILE_GRASS, TILES_X, TILES_Y, FLOW_RADIUS, FLOW_STEPS
+
+# Neighbour offsets (dx, dy) and the unit direction toward each.
+OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+UNIT = np.array([(dx, dy) for dx, dy in OFFSETS], dtype=np.float64)
+UNIT /= np.linalg.norm(UNIT, axis=1)[:, None]
+
+
+class FlowField:
+    # Shared path toward the players over the tile map.
+    # A breadth-first wavefront is grown from the players' tiles over the
+    # walkable tiles (grass) in a window reaching radius tiles around them,
+    # one vectorized step per ring. A diagonal step is only taken when both
+    # tiles beside it are walkable too, so paths don't cut terrain corners.
+    # Each tile then stores the unit direction to its neighbour closest to
+    # the nearest player, so an enemy looks up its next heading in O(1)
+    # instead of planning its own path. The field is only
+    # rebuilt when a player moves to another tile, and that rebuild is spread
+    # over the next few update() calls, steps rings at a time, so no single
+    # frame pays for the whole search; enemies follow the previous field until
+    # it is done. Enemies on water or stone
+    # are led onto the nearest walkable neighbour; tiles with no path (and the
+    # players' own tiles) have no direction, and callers steer straight.
+    def __init__(self, world, radius=FLOW_RADIUS, steps=FLOW_STEPS):
+        self.world = world
+        self.radius = radius
+        self.steps = steps
+        self.goals = None
+        self.origin = (0, 0)  # tile coordinates of directions[0, 0]
+        self.directions = np.zeros((0, 0, 2))
+        self.distance = np.zeros((0, 0))
+        self.builds = 0
+        self._pending = None  # rebuild in progress, from _build_steps()
+
+    def update(self, target_positions):
+        # Called once per simulation step.
+        goals = tuple((int(x // TILE_SIZE), int(y // TILE_SIZE)) for x, y in target_positions)
+        if self._pending is None:
+            if goals == self.goals:
+                return
+            if not self.builds:
+                # Nothing to fall back on while the first field is built.
+                self.build(goals)
+                return
+            self._pending = self._build_steps(goals)
+        try:
+            next(self._pending)
+        except StopIteration:
+            # Done; the next call starts another rebuild if the players have
+            # moved on in the meantime.
+            self._pending = None
+
+    def build(self, goals):
+        # Build the whole field for goals at once.
+        for _ in self._build_steps(goals):
+            pass
+
+    def _build_steps(self, goals):
+        # Yields after reading the tiles and after every self.steps rings of
+        # the search; the field switches to goals when it runs out.
+        r = self.radius
+        left, top = min(x for x, _ in goals), min(y for _, y in goals)
+        right, bottom = max(x for x, _ in goals) + 1, max(y for _, y in goals) + 1
+        ox, oy, x1, y1 = left - r, top - r, right + r, bottom + r
+        if self.world.bounded:
+            # Nothing past the world's edge is walkable, so the window stops
+            # one tile beyond it, or beyond a player on its last sliver: those
+            # tiles only ever point back in.
+            ox, oy = max(ox, min(0, left) - 1), max(oy, min(0, top) - 1)
+            x1, y1 = min(x1, max(TILES_X, right) + 1), min(y1, max(TILES_Y, bottom) + 1)
+        width, height = x1 - ox, y1 - oy
+        walkable = self.world.tiles(ox, oy, width, height) == TILE_GRASS
+        if self.world.bounded:
+            xs = np.arange(ox, ox + width)
+            ys = np.arange(oy, oy + height)
+            walkable &= ((ys >= 0) & (ys < TILES_Y))[:, None] & ((xs >= 0) & (xs < TILES_X))[None, :]
+
+        # open_steps[i] marks the tiles from which the step OFFSETS[i] doesn't
+        # squeeze past a blocked tile: always for straight steps, and for
+        # diagonal ones when both tiles beside the step are walkable.
+        padded_walkable = np.pad(walkable, 1)
+        open_steps = np.ones((len(OFFSETS), height, width), dtype=bool)
+        for i, (dx, dy) in enumerate(OFFSETS):
+            if dx and dy:
+                open_steps[i] = (padded_walkable[1:1 + height, 1 + dx:1 + dx + width]
+                                 & padded_walkable[1 + dy:1 + dy + height, 1:1 + width])
+        # The wavefront enters a walkable tile from the neighbour at
+        # OFFSETS[i] where entries[i] is set.
+        entries = open_steps & walkable
+        yield
+
+        # Breadth-first search from every goal at once, one ring of the
+        # wavefront per iteration. The frontier is copied into the middle of
+        # a zero-bordered buffer, whose shifted views are its neighbours.
+        frontier = np.zeros((height, width), dtype=bool)
+        for x, y in goals:
+            frontier[y - oy, x - ox] = True
+        distance = np.full((height, width), np.inf)
+        distance[frontier] = 0
+        reached = frontier.copy()
+        padded = np.zeros((height + 2, width + 2), dtype=bool)
+        shifted = [padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width] for dx, dy in OFFSETS]
+        grown = np.empty_like(frontier)
+        entered = np.empty_like(frontier)
+        step = 0
+        while frontier.any():
+            step += 1
+            padded[1:1 + height, 1:1 + width] = frontier
+            np.logical_and(shifted[0], entries[0], out=grown)
+            for view, entry in zip(shifted[1:], entries[1:]):
+                grown |= np.logical_and(view, entry, out=entered)
+            frontier = grown & ~reached
+            distance[frontier] = step
+            reached |= frontier
+            if step % self.steps == 0:
+                yield
+
+        # Point every tile at its neighbour with the smallest distance, if
+        # that neighbour is closer to a goal than the tile itself and can be
+        # stepped to.
+        padded = np.pad(distance, 1, constant_values=np.inf)
+        neighbours = np.stack([padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width] for dx, dy in OFFSETS])
+        neighbours[~open_steps] = np.inf
+        best = neighbours.argmin(axis=0)
+        downhill = neighbours.min(axis=0) < distance
+        directions = UNIT[best]
+        directions[~downhill] = 0
+        self.goals = goals
+        self.origin = (ox, oy)
+        self.directions = directions
+        self.distance = distance
+        self.builds += 1
+
+    def direction_at(self, pos):
+        # Unit (dx, dy) heading for a world position, or None to steer straight.
+        tx = int(pos[0] // TILE_SIZE) - self.origin[0]
+        ty = int(pos[1] // TILE_SIZE) - self.origin[1]
+        height, width = self.directions.shape[:2]
+        if 0 <= tx < width and 0 <= ty < height:
+            direction = self.directions[ty, tx]
+            if direction[0] or direction[1]:
+                return direction
+        return None
+
+    def directions_at(self, positions):
+        # Headings for an (n, 2) array of world positions; rows without one are zero.
+        height, width = self.directions.shape[:2]
+        tiles = np.floor(positions / TILE_SIZE).astype(np.int64) - self.origin
+        inside = (tiles >= 0).all(axis=1) & (tiles[:, 0] < width) & (tiles[:, 1] < height)
+        out = np.zeros((len(positions), 2))
+        out[inside] = self.directions[tiles[inside, 1], tiles[inside, 0]]
+        return out
@@ -1,30 +1,75 @@
 # engine/game.py
-import cv2
 import pygame
 import sys
-import time
 import random
-import numpy as np
 
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, BLACK, WHITE, RED
+from config import (SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WORLD_BOUNDED, BLACK, WHITE, RED,
+                    ENEMY_STORE, FLOW_FIELD, PLAYER_COLORS)
+from config import SIM_DT, MAX_SIM_STEPS
 from engine.camera import Camera
 from engine.world import World
+from engine.flow_field import FlowField
 from engine.player import Player
-from engine.enemy import Enemy
-from engine.projectile import Projectile
+from engine.enemy import enemy_pool
+from engine.enemy_store import EnemyStore
+from engine.projectile import projectile_pool
 from utils import gesture
+from shared.startup import StartupReport
+from shared.pipeline import GesturePipeline, camera_opener
+from shared.replay import LandmarkRecorder, LockstepClock, ReplayPipeline
+from shared.inference import ProcessDetector
+from shared.spatial import SpatialGrid
+from shared.text import TextCache
+from shared.idle import run_static_screen
+from shared.filters import GestureFilter
+from shared.hands import PlayerHands
+from shared.preview import PreviewRenderer
+from shared.profiler import FrameProfiler
 
 class RealmOfGesturesGame:
-    def __init__(self):
+    def __init__(self, record=None, replay=None, realtime=True, profile=False, profile_out=None, players=1,
+                 inference_process=False):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Realm of Gestures: Odyssey")
-        self.clock = pygame.time.Clock()
+        # A --fast replay runs unthrottled and steps the simulation by exactly
+        # one SIM_DT per replayed record
+        self.clock = LockstepClock(SIM_DT * 1000) if replay and not realtime else pygame.time.Clock()
 
-        # Set up camera input (OpenCV)
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, SCREEN_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, SCREEN_HEIGHT)
+        # Set up camera input and hand tracking on background threads, or play
+        # back a landmark recording instead of using the webcam. Every player's
+        # hand is found by the same tracking pass.
+        self.detector = None
+        if replay:
+            self.pipeline = ReplayPipeline(replay, (SCREEN_WIDTH, SCREEN_HEIGHT), realtime=realtime,
+                                           frame_size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            recorder = LandmarkRecorder(record) if record else None
+            if inference_process:
+                # Run MediaPipe (and the ROI cropping) in a worker process, off this interpreter's GIL.
+                self.detector = ProcessDetector(max_hands=players, track_roi=True,
+                                                frame_shape=(SCREEN_HEIGHT, SCREEN_WIDTH, 3))
+                detect, reset, warm_up = self.detector, self.detector.reset, self.detector.warm_up
+            else:
+                gesture.set_max_hands(players)
+                detect, reset, warm_up = gesture.get_hand_landmarks, gesture.reset_tracking, gesture.warm_up
+            # The camera is opened and MediaPipe loaded on the pipeline's
+            # threads while the menu is up, not before the first frame.
+            self.pipeline = GesturePipeline(camera_opener(0, SCREEN_WIDTH, SCREEN_HEIGHT),
+                                            detect, (SCREEN_WIDTH, SCREEN_HEIGHT),
+                                            recorder=recorder, reset=reset, warm_up=warm_up)
+        self.pipeline.start()
+        # Reports time to the first frame and to hand tracking being ready.
+        self.startup = StartupReport(self.pipeline)
+        # Each player follows one tracked hand, with its own smoothed,
+        # latency-compensated fingertip and pinch state.
+        self.player_hands = PlayerHands(players)
+        self.input_filters = [GestureFilter((SCREEN_WIDTH * (i + 1) // (players + 1), SCREEN_HEIGHT // 2))
+                              for i in range(players)]
+        # Per-stage frame timings; F3 toggles the overlay.
+        self.profiler = FrameProfiler(enabled=profile, export_path=profile_out)
+        # Camera thumbnail shown in the corner, refreshed at a lower rate than the game.
+        self.preview = PreviewRenderer((200, 150), fps=15)
 
         # Game states: "MENU", "GAME", "GAMEOVER"
         self.state = "MENU"
@@ -32,16 +77,38 @@ class RealmOfGesturesGame:
         # Initialize game world, camera, and objects.
         self.world = World()
         self.camera = Camera()
-        self.player = Player((WORLD_WIDTH // 2, WORLD_HEIGHT // 2))
+        # Shared enemy paths around water and stone, rebuilt when the player changes tile.
+        self.flow_field = FlowField(self.world) if FLOW_FIELD else None
+        # Start in the middle of a bounded world, or at the origin of an unbounded one.
+        self.start_pos = (WORLD_WIDTH // 2, WORLD_HEIGHT // 2) if WORLD_BOUNDED else (0, 0)
+        self.players = [Player(self.start_position(i, players), PLAYER_COLORS[i % len(PLAYER_COLORS)])
+                        for i in range(players)]
+        self.player = self.players[0]
         self.enemies = pygame.sprite.Group()
         self.projectiles = pygame.sprite.Group()
-        self.last_enemy_spawn = time.time()
-        self.enemy_spawn_interval = 2  # seconds
+        # Broadphase for enemy collisions, rebuilt after enemies move each tick.
+        self.enemy_grid = SpatialGrid(cell_size=64)
+        # Optional array-backed enemies for very large waves (see config.ENEMY_STORE).
+        self.enemy_store = EnemyStore() if ENEMY_STORE else None
+        self.spawn_timer = 0.0
+        self.enemy_spawn_interval = 2  # seconds of simulation time
+        self.accumulator = 0.0
+        self.frame_time = SIM_DT
+        self.game_over = False
 
         # HUD and score.
         self.score = 0
         self.font_large = pygame.font.SysFont("Arial", 48)
         self.font_small = pygame.font.SysFont("Arial", 24)
+        self.text = TextCache()  # rendered menu and HUD text
+
+    def start_position(self, index, count):
+        # Players start side by side, 120 pixels apart, around start_pos.
+        x, y = self.start_pos
+        return (x + (index - (count - 1) / 2) * 120, y)
+
+    def living_players(self):
+        return [player for player in self.players if player.health > 0]
 
     def run(self):
         while True:
@@ -51,139 +118,255 @@ class RealmOfGesturesGame:
                 self.game_loop()
             elif self.state == "GAMEOVER":
                 self.game_over_loop()
+            elif self.state == "QUIT":
+                self.cleanup()
 
     def menu_loop(self):
-        while self.state == "MENU":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.state = "GAME"
-
-            self.screen.fill(BLACK)
-            title_text = self.font_large.render("Realm of Gestures: Odyssey", True, WHITE)
-            instr_text = self.font_small.render("Use your hand to move, pinch to attack. Press ENTER to start.", True, WHITE)
-            self.screen.blit(title_text, ((SCREEN_WIDTH - title_text.get_width()) // 2, SCREEN_HEIGHT // 3))
-            self.screen.blit(instr_text, ((SCREEN_WIDTH - instr_text.get_width()) // 2, SCREEN_HEIGHT // 2))
-            pygame.display.flip()
-            self.clock.tick(30)
+        # Static screen: camera and tracking are paused and nothing is redrawn until input arrives.
+        self.pipeline.pause()
+        run_static_screen(self.draw_menu, self.handle_menu_event, lambda: self.state == "MENU",
+                          presented=self.startup.presented)
+
+    def draw_menu(self, screen):
+        screen.fill(BLACK)
+        title_text = self.text.render(self.font_large, "Realm of Gestures: Odyssey", True, WHITE)
+        instr_text = self.text.render(self.font_small, "Use your hand to move, pinch to attack. Press ENTER to start.", True, WHITE)
+        screen.blit(title_text, ((SCREEN_WIDTH - title_text.get_width()) // 2, SCREEN_HEIGHT // 3))
+        screen.blit(instr_text, ((SCREEN_WIDTH - instr_text.get_width()) // 2, SCREEN_HEIGHT // 2))
+
+    def handle_menu_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.state = "GAME"
 
     def game_loop(self):
+        self.new_game()
+        self.pipeline.resume()
+        self.clock.tick()  # don't count the time spent idle as a frame
+        while self.state == "GAME":
+            self.game_frame()
+
+    def new_game(self):
         # Reset state for a new game.
-        self.player.rect.center = (WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
-        self.enemies.empty()
-        self.projectiles.empty()
+        for i, player in enumerate(self.players):
+            player.reset(self.start_position(i, len(self.players)))
+        self.player_hands.reset()
+        # Kill rather than empty() so the sprites go back to their pools.
+        enemy_pool.release_all(self.enemies)
+        projectile_pool.release_all(self.projectiles)
+        self.enemy_grid.clear()
+        if self.enemy_store is not None:
+            self.enemy_store.clear()
         self.score = 0
-        self.player.health = 100
+        self.spawn_timer = 0.0
+        # Fixed-timestep state: unsimulated time carried between frames and the
+        # duration of the previous frame as reported by the clock.
+        self.accumulator = 0.0
+        self.frame_time = SIM_DT
+        self.game_over = False
 
-        game_over = False
-        while self.state == "GAME":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
+    def game_frame(self):
+        # Run one frame of gameplay: input, simulation and rendering.
+        profiler = self.profiler
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.cleanup()
+            profiler.handle_event(event)
+
+        # Read the latest gesture input without waiting on the camera.
+        state = self.pipeline.latest()
+        player_hands = self.player_hands.assign(state.hands if state is not None else ())
+        inputs = [input_filter.update_hand(state, hand, predict=self.pipeline.realtime)
+                  for input_filter, hand in zip(self.input_filters, player_hands)]
+        profiler.add_pipeline(self.pipeline)
+        profiler.add("latency", max(input_filter.latency for input_filter in self.input_filters))
+        profiler.mark("input")
+
+        # Map each player's screen gesture to world space.
+        offset = self.camera.offset
+        commands = [(pinching, (finger_pos[0] + offset.x, finger_pos[1] + offset.y))
+                    for pinching, finger_pos in inputs]
+
+        # Advance the simulation in fixed steps covering the time since the last
+        # frame. A slow frame runs several steps to catch up (up to MAX_SIM_STEPS;
+        # anything beyond that is dropped rather than snowballing).
+        self.accumulator += min(self.frame_time, SIM_DT * MAX_SIM_STEPS)
+        while self.accumulator >= SIM_DT:
+            self.simulate(SIM_DT, commands)
+            self.accumulator -= SIM_DT
+        alpha = self.accumulator / SIM_DT
+
+        # Update camera to follow the midpoint of the living players' interpolated positions.
+        followed = self.living_players() or self.players
+        center = sum((p.prev_pos.lerp(p.pos, alpha) for p in followed), pygame.Vector2()) / len(followed)
+        self.camera.update(self.player.image.get_rect(center=(round(center.x), round(center.y))))
+        # Build the world chunks the camera is heading into before it gets there.
+        velocity = sum((p.pos - p.prev_pos for p in followed), pygame.Vector2()) / (len(followed) * SIM_DT)
+        self.world.update(self.camera.offset, (SCREEN_WIDTH, SCREEN_HEIGHT), velocity)
+        profiler.mark("simulation")
+
+        # -------------------- RENDERING --------------------
+        offset = self.camera.offset
+        self.screen.fill(BLACK)
+        self.world.draw(self.screen, offset)
+        if self.enemy_store is not None:
+            self.enemy_store.draw(self.screen, offset, alpha)
+        for enemy in self.enemies:
+            self.screen.blit(enemy.image, enemy.render_topleft(alpha, offset))
+        for projectile in self.projectiles:
+            self.screen.blit(projectile.image, projectile.render_topleft(alpha, offset))
+        for player in self.living_players():
+            self.screen.blit(player.image, player.render_topleft(alpha, offset))
+
+        # HUD: Score and Health.
+        score_text = self.text.render(self.font_small, f"Score: {self.score}", True, WHITE)
+        self.screen.blit(score_text, (10, 10))
+        for i, player in enumerate(self.players):
+            label = f"P{i + 1} Health" if len(self.players) > 1 else "Health"
+            health_text = self.text.render(self.font_small, f"{label}: {max(0, player.health)}", True, WHITE)
+            self.screen.blit(health_text, (10, 40 + 30 * i))
+
+        # Display a thumbnail of the camera feed.
+        if state is not None:
+            self.preview.update(state.frame, seq=state.seq)
+            self.preview.draw(self.screen, (SCREEN_WIDTH - 210, 10))
+
+        # Visual indicator for pinch gestures.
+        for pinching, finger_pos in inputs:
+            if pinching:
+                pygame.draw.circle(self.screen, RED, finger_pos, 15)
+        profiler.draw(self.screen)
+        profiler.mark("render")
+
+        pygame.display.flip()
+        self.startup.presented()
+        profiler.mark("flip")
+        profiler.end_frame()
+        self.frame_time = self.clock.tick(60) / 1000.0
 
-            # Capture camera frame and process gesture input.
-            ret, frame = self.cap.read()
-            if not ret:
+        if self.game_over:
+            self.state = "GAMEOVER"
+
+    def simulate(self, dt, commands):
+        # Advance the game by one fixed step of dt seconds. commands holds a
+        # (pinching, world_target) pair per player.
+        for player, (pinching, world_target) in zip(self.players, commands):
+            if player.health <= 0:
                 continue
-            frame = cv2.flip(frame, 1)
-            results = gesture.get_hand_landmarks(frame)
-            pinch_distance, finger_pos = None, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-            if results.multi_hand_landmarks:
-                for handLms in results.multi_hand_landmarks:
-                    pinch_distance, finger_pos = gesture.get_pinch_status(handLms)
-                    # Optionally, landmarks can be drawn here if desired.
-
-            # Map screen gesture to world space.
-            world_target = (finger_pos[0] + self.camera.offset.x, finger_pos[1] + self.camera.offset.y)
-            self.player.update(world_target)
+            player.update(world_target, dt)
 
             # Attack if pinch gesture is detected and cooldown allows.
-            if pinch_distance is not None and pinch_distance < 0.05 and self.player.can_attack():
-                proj = self.player.attack()
+            if pinching and player.can_attack():
+                proj = player.attack()
                 self.projectiles.add(proj)
+        living = self.living_players()
+        if not living:
+            return
 
-            # Spawn enemies periodically.
-            current_time = time.time()
-            if current_time - self.last_enemy_spawn > self.enemy_spawn_interval:
-                spawn_x = random.randint(0, WORLD_WIDTH)
-                spawn_y = random.choice([0, WORLD_HEIGHT])
-                enemy = Enemy((spawn_x, spawn_y))
-                self.enemies.add(enemy)
-                self.last_enemy_spawn = current_time
-
-            # Update enemies and check collisions with the player.
-            for enemy in self.enemies:
-                enemy.update(self.player.rect)
-                if enemy.rect.colliderect(self.player.rect):
-                    self.player.health -= 10
-                    enemy.kill()
-                    if self.player.health <= 0:
-                        game_over = True
-
-            self.projectiles.update()
-            for projectile in self.projectiles:
-                hits = pygame.sprite.spritecollide(projectile, self.enemies, False)
-                for enemy in hits:
-                    enemy.take_damage(25)
-                    projectile.kill()
-                    if not enemy.alive():
-                        self.score += 50
-
-            # Update camera to follow the player.
-            self.camera.update(self.player.rect)
-
-            # -------------------- RENDERING --------------------
-            self.screen.fill(BLACK)
-            self.world.draw(self.screen, self.camera.offset)
-            for enemy in self.enemies:
-                self.screen.blit(enemy.image, enemy.rect.topleft - self.camera.offset)
-            for projectile in self.projectiles:
-                self.screen.blit(projectile.image, projectile.rect.topleft - self.camera.offset)
-            self.screen.blit(self.player.image, self.player.rect.topleft - self.camera.offset)
-
-            # HUD: Score and Health.
-            score_text = self.font_small.render(f"Score: {self.score}", True, WHITE)
-            health_text = self.font_small.render(f"Health: {self.player.health}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
-            self.screen.blit(health_text, (10, 40))
-
-            # Display a thumbnail of the camera feed.
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(np.rot90(frame_rgb))
-            thumb = pygame.transform.scale(frame_surface, (200, 150))
-            self.screen.blit(thumb, (SCREEN_WIDTH - 210, 10))
-
-            # Visual indicator for pinch gesture.
-            if pinch_distance is not None and pinch_distance < 0.05:
-                pygame.draw.circle(self.screen, RED, finger_pos, 15)
+        # Spawn enemies periodically.
+        self.spawn_timer += dt
+        if self.spawn_timer > self.enemy_spawn_interval:
+            self.spawn_enemy(self.spawn_position())
+            self.spawn_timer = 0.0
+
+        # Update enemies and projectiles, then resolve collisions.
+        self.projectiles.update(dt)
+        if self.flow_field is not None:
+            self.flow_field.update([player.pos for player in living])
+        if self.enemy_store is not None:
+            self.update_enemy_store(dt, living)
+        else:
+            self.update_enemy_sprites(dt, living)
+        if not self.living_players():
+            self.game_over = True
+
+    def spawn_position(self):
+        # On the top or bottom edge of a bounded world; just outside the view otherwise.
+        if WORLD_BOUNDED:
+            return random.randint(0, WORLD_WIDTH), random.choice([0, WORLD_HEIGHT])
+        left, top = self.camera.offset
+        x = random.uniform(left - 50, left + SCREEN_WIDTH + 50)
+        y = random.choice([top - 50, top + SCREEN_HEIGHT + 50])
+        return x, y
+
+    def spawn_enemy(self, pos):
+        if self.enemy_store is not None:
+            self.enemy_store.spawn(pos)
+        else:
+            self.enemies.add(enemy_pool.acquire(pos))
 
-            pygame.display.flip()
-            self.clock.tick(60)
+    def update_enemy_sprites(self, dt, players):
+        # Move enemy sprites toward the given players and resolve their collisions.
+        self.enemies.update([player.pos for player in players], dt, self.flow_field)
+        self.enemy_grid.rebuild(self.enemies)
 
-            if game_over:
-                self.state = "GAMEOVER"
+        # Check collisions with the players.
+        for player in players:
+            for enemy in self.enemy_grid.query_rect(player.rect):
+                player.health -= 10
+                enemy.kill()
+                self.enemy_grid.remove(enemy)
+
+        for projectile in self.projectiles:
+            hits = self.enemy_grid.query_rect(projectile.rect)
+            for enemy in hits:
+                enemy.take_damage(25)
+                projectile.kill()
+                if not enemy.alive():
+                    self.enemy_grid.remove(enemy)
+                    self.score += 50
+
+    def update_enemy_store(self, dt, players):
+        # Same rules as update_enemy_sprites, applied to all enemies at once.
+        store = self.enemy_store
+        store.update([tuple(player.pos) for player in players], dt, self.flow_field)
+
+        # Enemies touching a player hit it once each and are removed.
+        touching = store.overlaps([tuple(player.rect) for player in players])
+        for player, row in zip(players, touching):
+            player.health -= 10 * int(row.sum())
+        if touching.any():
+            store.remove(touching.any(axis=0))
+
+        projectiles = self.projectiles.sprites()
+        if projectiles and len(store):
+            overlap = store.overlaps([tuple(p.rect) for p in projectiles])
+            for projectile, hit in zip(projectiles, overlap.any(axis=1)):
+                if hit:
+                    projectile.kill()
+            self.score += 50 * store.apply_damage(25 * overlap.sum(axis=0))
 
     def game_over_loop(self):
-        while self.state == "GAMEOVER":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.state = "MENU"
-            self.screen.fill(BLACK)
-            over_text = self.font_large.render("GAME OVER", True, RED)
-            score_text = self.font_small.render(f"Final Score: {self.score}", True, WHITE)
-            instr_text = self.font_small.render("Press ENTER to return to menu", True, WHITE)
-            self.screen.blit(over_text, ((SCREEN_WIDTH - over_text.get_width()) // 2, SCREEN_HEIGHT // 3))
-            self.screen.blit(score_text, ((SCREEN_WIDTH - score_text.get_width()) // 2, SCREEN_HEIGHT // 2))
-            self.screen.blit(instr_text, ((SCREEN_WIDTH - instr_text.get_width()) // 2, SCREEN_HEIGHT // 2 + 40))
-            pygame.display.flip()
-            self.clock.tick(30)
+        self.pipeline.pause()
+        run_static_screen(self.draw_game_over, self.handle_game_over_event, lambda: self.state == "GAMEOVER")
+
+    def draw_game_over(self, screen):
+        screen.fill(BLACK)
+        over_text = self.text.render(self.font_large, "GAME OVER", True, RED)
+        score_text = self.text.render(self.font_small, f"Final Score: {self.score}", True, WHITE)
+        instr_text = self.text.render(self.font_small, "Press ENTER to return to menu", True, WHITE)
+        screen.blit(over_text, ((SCREEN_WIDTH - over_text.get_width()) // 2, SCREEN_HEIGHT // 3))
+        screen.blit(score_text, ((SCREEN_WIDTH - score_text.get_width()) // 2, SCREEN_HEIGHT // 2))
+        screen.blit(instr_text, ((SCREEN_WIDTH - instr_text.get_width()) // 2, SCREEN_HEIGHT // 2 + 40))
+
+    def handle_game_over_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.state = "MENU"
 
     def cleanup(self):
-        self.cap.release()
+        self.pipeline.stop()
+        if self.detector is not None:
+            self.detector.close()
+        self.profiler.close()
         pygame.quit()
         sys.exit()
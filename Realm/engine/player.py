@@ -1,38 +1,47 @@
 # engine/player.py
 import pygame
-import time
-from config import BLUE, WORLD_WIDTH, WORLD_HEIGHT
+from config import BLUE, WORLD_WIDTH, WORLD_HEIGHT, WORLD_BOUNDED
+from engine.entity import Entity
 
-class Player(pygame.sprite.Sprite):
-    def __init__(self, pos):
-        super().__init__()
+class Player(Entity):
+    def __init__(self, pos, color=BLUE):
         # Create a circular player sprite.
-        self.image = pygame.Surface((50, 50), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, BLUE, (25, 25), 25)
-        self.rect = self.image.get_rect(center=pos)
-        self.speed = 5
+        image = pygame.Surface((50, 50), pygame.SRCALPHA)
+        pygame.draw.circle(image, color, (25, 25), 25)
+        super().__init__(image, pos)
+        self.speed = 300  # pixels per second
         self.health = 100
-        self.last_attack_time = 0
         self.attack_cooldown = 0.5  # seconds between attacks
+        self.attack_timer = 0.0     # simulation time until the next attack is allowed
 
-    def update(self, target_pos):
+    def reset(self, pos):
+        self.pos.update(pos)
+        self.prev_pos.update(pos)
+        self.sync_rect()
+        self.health = 100
+        self.attack_timer = 0.0
+
+    def update(self, target_pos, dt):
         # Smoothly move toward the target position.
-        direction = pygame.Vector2(target_pos) - pygame.Vector2(self.rect.center)
-        if direction.length() > self.speed:
-            direction = direction.normalize() * self.speed
-        self.rect.centerx += int(direction.x)
-        self.rect.centery += int(direction.y)
+        self.begin_step()
+        self.attack_timer = max(0.0, self.attack_timer - dt)
+        direction = pygame.Vector2(target_pos) - self.pos
+        step = self.speed * dt
+        if direction.length() > step:
+            direction = direction.normalize() * step
+        self.pos += direction
 
         # Clamp the player within world bounds.
-        self.rect.left = max(self.rect.left, 0)
-        self.rect.top = max(self.rect.top, 0)
-        self.rect.right = min(self.rect.right, WORLD_WIDTH)
-        self.rect.bottom = min(self.rect.bottom, WORLD_HEIGHT)
+        if WORLD_BOUNDED:
+            half_w, half_h = self.rect.width / 2, self.rect.height / 2
+            self.pos.x = max(half_w, min(self.pos.x, WORLD_WIDTH - half_w))
+            self.pos.y = max(half_h, min(self.pos.y, WORLD_HEIGHT - half_h))
+        self.sync_rect()
 
     def can_attack(self):
-        return time.time() - self.last_attack_time > self.attack_cooldown
+        return self.attack_timer <= 0
 
     def attack(self):
-        self.last_attack_time = time.time()
-        from engine.projectile import Projectile  # Import here to avoid circular dependencies
-        return Projectile(self.rect.center)
+        self.attack_timer = self.attack_cooldown
+        from engine.projectile import projectile_pool  # Import here to avoid circular dependencies
+        return projectile_pool.acquire(self.rect.center)
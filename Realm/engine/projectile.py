@@ -1,20 +1,38 @@
 # engine/projectile.py
 import pygame
-from config import YELLOW, WORLD_WIDTH, WORLD_HEIGHT
+from config import YELLOW, WORLD_WIDTH, WORLD_HEIGHT, WORLD_BOUNDED, PROJECTILE_RANGE
+from engine.entity import Entity
+from shared.pool import SpritePool, shared_image
 
-class Projectile(pygame.sprite.Sprite):
+def _projectile_image():
+    image = pygame.Surface((10, 10), pygame.SRCALPHA)
+    pygame.draw.circle(image, YELLOW, (5, 5), 5)
+    return image
+
+class Projectile(Entity):
     def __init__(self, pos):
-        super().__init__()
-        self.image = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, YELLOW, (5, 5), 5)
-        self.rect = self.image.get_rect(center=pos)
-        self.speed = 10
+        super().__init__(shared_image("realm.projectile", _projectile_image), pos)
+        self.speed = 600  # pixels per second
         self.direction = pygame.Vector2(0, -1)  # Projectile moves upward
+        self.range = PROJECTILE_RANGE  # pixels left to fly (unbounded worlds only)
+
+    def reset(self, pos):
+        self.place(pos)
+        self.range = PROJECTILE_RANGE
 
-    def update(self):
-        self.rect.x += int(self.direction.x * self.speed)
-        self.rect.y += int(self.direction.y * self.speed)
-        # Remove projectile if it goes off-world.
-        if (self.rect.bottom < 0 or self.rect.top > WORLD_HEIGHT or
-            self.rect.right < 0 or self.rect.left > WORLD_WIDTH):
+    def update(self, dt):
+        self.begin_step()
+        self.pos += self.direction * (self.speed * dt)
+        self.range -= self.speed * dt
+        self.sync_rect()
+        # Remove projectile once it leaves a bounded world, or once it runs
+        # out of range in an unbounded one.
+        if WORLD_BOUNDED:
+            if (self.rect.bottom < 0 or self.rect.top > WORLD_HEIGHT or
+                    self.rect.right < 0 or self.rect.left > WORLD_WIDTH):
+                self.kill()
+        elif self.range <= 0:
             self.kill()
+
+# Projectiles that leave the world or hit an enemy are recycled through this pool.
+projectile_pool = SpritePool(Projectile)
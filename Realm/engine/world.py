@@ -1,26 +1,168 @@
 # engine/world.py
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
 import pygame
-import random
-from config import TILE_SIZE, TILES_X, TILES_Y, TILE_COLORS, TILE_GRASS, TILE_WATER, TILE_STONE, BLACK
+from config import (TILE_SIZE, TILES_X, TILES_Y, TILE_COLORS, TILE_GRASS, TILE_WATER, TILE_STONE,
+                    WORLD_BOUNDED, WORLD_SEED, NOISE_SCALE, CHUNK_TILES, CHUNK_CACHE,
+                    PREFETCH_TIME, PREFETCH_PER_FRAME, BLACK)
+
+CHUNK_SIZE = CHUNK_TILES * TILE_SIZE
+
+# Generated tiles (a CHUNK_TILES x CHUNK_TILES array indexed [y, x]) and their
+# pre-rendered surface (None until the chunk is first drawn).
+Chunk = namedtuple("Chunk", ["tiles", "surface"])
+
+# RGB colour of each tile type, indexable by a tile array.
+PALETTE = np.array([TILE_COLORS[t] for t in range(len(TILE_COLORS))], dtype=np.uint8)
+
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+def _hash(ix, iy, seed):
+    # Deterministic pseudo-random value in [0, 1) for integer lattice points.
+    h = (ix.astype(np.uint64) * np.uint64(374761393) + iy.astype(np.uint64) * np.uint64(668265263)
+         + np.uint64(seed * 2246822519 & 0xFFFFFFFF)) & _MASK
+    h = ((h ^ (h >> np.uint64(13))) * np.uint64(1274126177)) & _MASK
+    h ^= h >> np.uint64(16)
+    return h.astype(np.float64) / 4294967296.0
+
+
+def value_noise(xs, ys, scale, seed):
+    # Smoothly interpolated lattice noise in [0, 1) at tile coordinates xs, ys.
+    gx, gy = xs / scale, ys / scale
+    x0, y0 = np.floor(gx), np.floor(gy)
+    fx, fy = gx - x0, gy - y0
+    sx, sy = fx * fx * (3 - 2 * fx), fy * fy * (3 - 2 * fy)
+    x0, y0 = x0.astype(np.int64), y0.astype(np.int64)
+    top = _hash(x0, y0, seed) * (1 - sx) + _hash(x0 + 1, y0, seed) * sx
+    bottom = _hash(x0, y0 + 1, seed) * (1 - sx) + _hash(x0 + 1, y0 + 1, seed) * sx
+    return top * (1 - sy) + bottom * sy
+
+
+def generate_tiles(x0, y0, width, height, seed=WORLD_SEED):
+    # Tile types for the width x height block whose top-left tile is (x0, y0).
+    ys, xs = np.mgrid[y0:y0 + height, x0:x0 + width].astype(np.float64)
+    n = 0.65 * value_noise(xs, ys, NOISE_SCALE, seed) + 0.35 * value_noise(xs, ys, NOISE_SCALE / 3, seed + 1)
+    tiles = np.full((height, width), TILE_GRASS, dtype=np.uint8)
+    tiles[n < 0.35] = TILE_WATER
+    tiles[n > 0.68] = TILE_STONE
+    return tiles
+
 
 class World:
-    def __init__(self):
-        # Generate a random tile map.
-        self.map = [[random.choice([TILE_GRASS, TILE_WATER, TILE_STONE]) for _ in range(TILES_X)]
-                    for _ in range(TILES_Y)]
+    # Chunked tile map generated on demand.
+    # Tiles come from seeded noise, one chunk at a time, and each chunk is
+    # rendered once into a surface. Only the CHUNK_CACHE most recently used
+    # chunks are kept, so memory stays constant however far the player goes;
+    # an evicted chunk is simply regenerated. Edited tiles are kept separately
+    # and survive eviction. update() builds chunks just ahead of the camera a
+    # few per frame, so crossing into new ground doesn't stall a frame.
+    # A bounded world (WORLD_WIDTH/WORLD_HEIGHT set) is cropped at its edges.
+    def __init__(self, seed=WORLD_SEED, cache_size=CHUNK_CACHE, bounded=WORLD_BOUNDED):
+        self.seed = seed
+        self.bounded = bounded
+        self.cache_size = cache_size
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> Chunk, least recently used first
+        self.edits = {}              # (x, y) -> tile set through set_tile()
+        self._pending = deque()
+        self.generated = 0
+
+    def in_bounds(self, x, y):
+        return not self.bounded or (0 <= x < TILES_X and 0 <= y < TILES_Y)
+
+    def tile_at(self, x, y):
+        chunk = self.get_chunk(x // CHUNK_TILES, y // CHUNK_TILES, render=False)
+        return int(chunk.tiles[y % CHUNK_TILES, x % CHUNK_TILES])
+
+    def tiles(self, x0, y0, width, height):
+        # Tile array (indexed [y, x]) for a block of tiles, assembled from chunks.
+        out = np.empty((height, width), dtype=np.uint8)
+        for cy in range(y0 // CHUNK_TILES, (y0 + height - 1) // CHUNK_TILES + 1):
+            for cx in range(x0 // CHUNK_TILES, (x0 + width - 1) // CHUNK_TILES + 1):
+                tiles = self.get_chunk(cx, cy, render=False).tiles
+                bx, by = cx * CHUNK_TILES, cy * CHUNK_TILES
+                ax0, ay0 = max(x0, bx), max(y0, by)
+                ax1, ay1 = min(x0 + width, bx + CHUNK_TILES), min(y0 + height, by + CHUNK_TILES)
+                out[ay0 - y0:ay1 - y0, ax0 - x0:ax1 - x0] = tiles[ay0 - by:ay1 - by, ax0 - bx:ax1 - bx]
+        return out
+
+    def set_tile(self, x, y, tile):
+        # Change a tile and drop only the cached chunk that contains it.
+        self.edits[(x, y)] = tile
+        self.chunks.pop((x // CHUNK_TILES, y // CHUNK_TILES), None)
+
+    def get_chunk(self, cx, cy, render=True):
+        # With render=False only the tiles are needed and the surface may still be None.
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.build_chunk(cx, cy)
+            if len(self.chunks) > self.cache_size:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        if render and chunk.surface is None:
+            chunk = self.chunks[key] = chunk._replace(surface=self.render_chunk(cx, cy, chunk.tiles))
+        return chunk
+
+    def build_chunk(self, cx, cy):
+        start_x, start_y = cx * CHUNK_TILES, cy * CHUNK_TILES
+        tiles = generate_tiles(start_x, start_y, CHUNK_TILES, CHUNK_TILES, self.seed)
+        for (x, y), tile in self.edits.items():
+            if start_x <= x < start_x + CHUNK_TILES and start_y <= y < start_y + CHUNK_TILES:
+                tiles[y - start_y, x - start_x] = tile
+        self.generated += 1
+        return Chunk(tiles, None)
+
+    def render_chunk(self, cx, cy, tiles):
+        # Paint every tile with its colour and a one-pixel black border in one
+        # array write; chunks on the edge of a bounded world are cropped.
+        width = height = CHUNK_TILES
+        if self.bounded:
+            width = max(0, min(CHUNK_TILES, TILES_X - cx * CHUNK_TILES))
+            height = max(0, min(CHUNK_TILES, TILES_Y - cy * CHUNK_TILES))
+        surface = pygame.Surface((width * TILE_SIZE, height * TILE_SIZE)).convert()
+        if width and height:
+            colors = PALETTE[tiles[:height, :width]].repeat(TILE_SIZE, axis=0).repeat(TILE_SIZE, axis=1)
+            colors[::TILE_SIZE, :] = BLACK
+            colors[TILE_SIZE - 1::TILE_SIZE, :] = BLACK
+            colors[:, ::TILE_SIZE] = BLACK
+            colors[:, TILE_SIZE - 1::TILE_SIZE] = BLACK
+            pygame.surfarray.pixels3d(surface)[...] = colors.swapaxes(0, 1)
+        return surface
+
+    def _chunk_range(self, left, top, width, height):
+        start_cx, start_cy = int(left // CHUNK_SIZE), int(top // CHUNK_SIZE)
+        end_cx, end_cy = int((left + width) // CHUNK_SIZE) + 1, int((top + height) // CHUNK_SIZE) + 1
+        if self.bounded:
+            start_cx, start_cy = max(0, start_cx), max(0, start_cy)
+            end_cx = min((TILES_X + CHUNK_TILES - 1) // CHUNK_TILES, end_cx)
+            end_cy = min((TILES_Y + CHUNK_TILES - 1) // CHUNK_TILES, end_cy)
+        return range(start_cx, end_cx), range(start_cy, end_cy)
+
+    def update(self, camera_offset, view_size, velocity):
+        # Queue the chunks the view will cover PREFETCH_TIME seconds from now
+        # at the given velocity (pixels per second), then build a few of them.
+        ahead_x = camera_offset.x + velocity.x * PREFETCH_TIME
+        ahead_y = camera_offset.y + velocity.y * PREFETCH_TIME
+        xs, ys = self._chunk_range(ahead_x, ahead_y, view_size[0], view_size[1])
+        for cy in ys:
+            for cx in xs:
+                key = (cx, cy)
+                chunk = self.chunks.get(key)
+                if (chunk is None or chunk.surface is None) and key not in self._pending:
+                    self._pending.append(key)
+        for _ in range(min(PREFETCH_PER_FRAME, len(self._pending))):
+            key = self._pending.popleft()
+            chunk = self.chunks.get(key)
+            if chunk is None or chunk.surface is None:
+                self.get_chunk(*key)
 
     def draw(self, surface, camera_offset):
-        # Calculate visible tiles (ensure indices are integers)
-        start_x = max(0, int(camera_offset.x // TILE_SIZE))
-        start_y = max(0, int(camera_offset.y // TILE_SIZE))
-        end_x = min(TILES_X, int((camera_offset.x + surface.get_width()) // TILE_SIZE) + 1)
-        end_y = min(TILES_Y, int((camera_offset.y + surface.get_height()) // TILE_SIZE) + 1)
-        for y in range(start_y, end_y):
-            for x in range(start_x, end_x):
-                tile = self.map[y][x]
-                color = TILE_COLORS[tile]
-                rect = pygame.Rect(x * TILE_SIZE - int(camera_offset.x), 
-                                   y * TILE_SIZE - int(camera_offset.y),
-                                   TILE_SIZE, TILE_SIZE)
-                pygame.draw.rect(surface, color, rect)
-                pygame.draw.rect(surface, BLACK, rect, 1)  # Draw tile border
+        # Blit only the chunks that intersect the camera view.
+        offset_x, offset_y = int(camera_offset.x), int(camera_offset.y)
+        xs, ys = self._chunk_range(offset_x, offset_y, surface.get_width(), surface.get_height())
+        for cy in ys:
+            for cx in xs:
+                surface.blit(self.get_chunk(cx, cy).surface, (cx * CHUNK_SIZE - offset_x, cy * CHUNK_SIZE - offset_y))
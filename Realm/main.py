@@ -1,8 +1,26 @@
 # main.py
+import argparse
+import os
+import sys
+
+# Make the shared helpers at the repository root importable.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
 from engine.game import RealmOfGesturesGame
+from shared.profiler import add_profiler_arguments
+from shared.replay import add_input_arguments, seed_random
 
 def main():
-    game = RealmOfGesturesGame()
+    parser = argparse.ArgumentParser(description="Realm of Gestures: Odyssey")
+    add_input_arguments(parser)
+    add_profiler_arguments(parser)
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1,
+                        help="local players, one hand each (default 1)")
+    args = parser.parse_args()
+    seed_random(args)
+    game = RealmOfGesturesGame(record=args.record, replay=args.replay, realtime=not args.fast,
+                               profile=args.profile, profile_out=args.profile_out, players=args.players,
+                               inference_process=args.inference_process)
     game.run()
 
 if __name__ == "__main__":
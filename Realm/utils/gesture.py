@@ -1,26 +1,39 @@
 # utils/gesture.py
-import cv2
-import mediapipe as mp
-import numpy as np
-from config import SCREEN_WIDTH, SCREEN_HEIGHT
+from shared.roi import RoiTracker
+from shared.startup import LazyHands
 
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
-mp_draw = mp.solutions.drawing_utils
+# MediaPipe is only imported and loaded by warm_up() (or the first frame), on
+# the gesture pipeline's inference thread.
+hands = LazyHands(max_num_hands=1, min_detection_confidence=0.7)
 
-def get_hand_landmarks(frame):
+# Crops each frame around the hand found in the previous one (see shared/roi.py).
+roi_tracker = RoiTracker(hands)
+
+def get_hand_landmarks(frame, track_roi=True):
+    # With track_roi, only the region around the hand is processed; landmarks
+    # are still returned in full-frame normalized coordinates.
+    if track_roi:
+        return roi_tracker.process(frame)
+    import cv2
     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     results = hands.process(frame_rgb)
     return results
 
-def get_pinch_status(landmarks):
-    # Get the thumb tip and index finger tip.
-    thumb_tip = landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    index_tip = landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    # Calculate Euclidean distance.
-    x1, y1 = thumb_tip.x, thumb_tip.y
-    x2, y2 = index_tip.x, index_tip.y
-    dist = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    # Convert normalized index tip to screen coordinates.
-    finger_pos = (int(index_tip.x * SCREEN_WIDTH), int(index_tip.y * SCREEN_HEIGHT))
-    return dist, finger_pos
+def set_max_hands(count):
+    # Track up to count hands (one per local player). They all come from the
+    # same process() call, so a second player doesn't add a second inference.
+    global hands, roi_tracker
+    if count == roi_tracker.max_hands:
+        return
+    hands.close()
+    hands = LazyHands(max_num_hands=count, min_detection_confidence=0.7)
+    roi_tracker = RoiTracker(hands, max_hands=count)
+
+def warm_up():
+    # Load the model and run it once, before the first camera frame arrives.
+    hands.warm_up()
+
+def reset_tracking():
+    # Forget the hand found in earlier frames (after the camera was paused).
+    roi_tracker.reset()
+    hands.reset()
@@ -1,32 +1,48 @@
-import cv2
-import mediapipe as mp
 import pygame
+import argparse
+import os
 import sys
 import random
-import numpy as np
-import time
 
-# -------------------- SETUP: Mediapipe & Constants --------------------
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
-mp_draw = mp.solutions.drawing_utils
+# Make the shared helpers at the repository root importable.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+from shared.startup import LazyHands, StartupReport
+from shared.pipeline import GesturePipeline, camera_opener
+from shared.replay import LandmarkRecorder, LockstepClock, ReplayPipeline, add_input_arguments, seed_random
+from shared.pool import PooledSprite, SpritePool, shared_image
+from shared.preview import PreviewRenderer
+from shared.profiler import FrameProfiler, add_profiler_arguments
+from shared.spatial import SpatialGrid
+from shared.text import TextCache
+from shared.idle import run_static_screen
+from shared.filters import GestureFilter
+from shared.hands import PlayerHands
+from shared.inference import ProcessDetector
+from starfield import Starfield
 
+# -------------------- SETUP: Constants --------------------
 # Define some colors
 WHITE  = (255, 255, 255)
 BLACK  = (0, 0, 0)
 RED    = (255, 0, 0)
 GREEN  = (0, 255, 0)
 YELLOW = (255, 255, 0)
+CYAN   = (0, 200, 255)
+
+# Ship colour for each player
+PLAYER_COLORS = (GREEN, CYAN)
 
 # -------------------- GAME OBJECT CLASSES --------------------
 class Spaceship(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, color=GREEN):
         super().__init__()
         # Create a transparent surface for the spaceship
         self.image = pygame.Surface((50, 50), pygame.SRCALPHA)
-        # Draw a green triangle (pointing upward)
-        pygame.draw.polygon(self.image, GREEN, [(25, 0), (0, 50), (50, 50)])
+        # Draw a triangle (pointing upward)
+        pygame.draw.polygon(self.image, color, [(25, 0), (0, 50), (50, 50)])
         self.rect = self.image.get_rect(center=pos)
+        self.last_shot_time = 0
+        self.destroyed = False
     
     def update(self, pos):
         # Update spaceship position to follow the provided coordinates
@@ -35,14 +51,27 @@ class Spaceship(pygame.sprite.Sprite):
     def draw(self, surface):
         surface.blit(self.image, self.rect)
 
-class Bullet(pygame.sprite.Sprite):
+def make_bullet_image():
+    image = pygame.Surface((5, 15))
+    image.fill(YELLOW)
+    return image
+
+def make_enemy_image():
+    image = pygame.Surface((40, 40))
+    image.fill(RED)
+    return image
+
+class Bullet(PooledSprite):
     def __init__(self, pos):
         super().__init__()
-        self.image = pygame.Surface((5, 15))
-        self.image.fill(YELLOW)
+        # All bullets share one image
+        self.image = shared_image("shooter.bullet", make_bullet_image)
         self.rect = self.image.get_rect(center=pos)
         self.speed = -10  # move upward
     
+    def reset(self, pos):
+        self.rect.center = pos
+    
     def update(self):
         self.rect.y += self.speed
         # Remove bullet if it goes off-screen
@@ -52,14 +81,18 @@ class Bullet(pygame.sprite.Sprite):
     def draw(self, surface):
         surface.blit(self.image, self.rect)
 
-class Enemy(pygame.sprite.Sprite):
+class Enemy(PooledSprite):
     def __init__(self, pos, speed):
         super().__init__()
-        self.image = pygame.Surface((40, 40))
-        self.image.fill(RED)
+        # All enemies share one image
+        self.image = shared_image("shooter.enemy", make_enemy_image)
         self.rect = self.image.get_rect(center=pos)
         self.speed = speed
     
+    def reset(self, pos, speed):
+        self.rect.center = pos
+        self.speed = speed
+    
     def update(self):
         self.rect.y += self.speed
         # Remove enemy if it goes off-screen
@@ -69,40 +102,86 @@ class Enemy(pygame.sprite.Sprite):
     def draw(self, surface):
         surface.blit(self.image, self.rect)
 
+# Killed bullets and enemies are recycled through these pools
+bullet_pool = SpritePool(Bullet)
+enemy_pool = SpritePool(Enemy)
+
 # -------------------- MAIN GAME CLASS --------------------
 class SpaceGestureShooter:
-    def __init__(self):
+    def __init__(self, record=None, replay=None, realtime=True, profile=False, profile_out=None,
+                 stars=300, players=1, inference_process=False):
         # Initialize Pygame
         pygame.init()
         self.width, self.height = 800, 600
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Space Gesture Shooter")
-        self.clock = pygame.time.Clock()
+        # A --fast replay runs unthrottled with a fixed frame time
+        self.clock = LockstepClock() if replay and not realtime else pygame.time.Clock()
         
         # Load fonts for UI
         self.font_large = pygame.font.SysFont("Arial", 48)
         self.font_small = pygame.font.SysFont("Arial", 24)
+        self.text = TextCache()  # rendered menu and HUD text
         
         # Define game states: "MENU", "GAME", "GAMEOVER"
         self.state = "MENU"
         
-        # Setup the webcam
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Setup the webcam and hand tracking on background threads. A single
+        # Mediapipe instance tracks every player's hand in one pass per frame.
+        # Mediapipe is loaded, warmed up and the camera opened in the background
+        # while the menu is shown
+        self.players = players
+        self.hands = LazyHands(max_num_hands=players, min_detection_confidence=0.7)
+        self.detector = None
+        if replay:
+            # Play back a landmark recording instead of using the webcam
+            self.pipeline = ReplayPipeline(replay, (self.width, self.height), realtime=realtime,
+                                           frame_size=(self.width, self.height))
+        else:
+            recorder = LandmarkRecorder(record) if record else None
+            detect, reset, warm_up = self.get_hand_landmarks, self.hands.reset, self.hands.warm_up
+            if inference_process:
+                # Run Mediapipe in a worker process, off this interpreter's GIL
+                self.detector = ProcessDetector(max_hands=players, frame_shape=(self.height, self.width, 3))
+                detect, reset, warm_up = self.detector, self.detector.reset, self.detector.warm_up
+            self.pipeline = GesturePipeline(camera_opener(0, self.width, self.height),
+                                            detect, (self.width, self.height),
+                                            recorder=recorder, reset=reset, warm_up=warm_up)
+        self.pipeline.start()
+        # Reports time to the first frame and to hand tracking being ready
+        self.startup = StartupReport(self.pipeline)
+        # Each player follows one tracked hand, with its own smoothed,
+        # latency-compensated fingertip and pinch state
+        self.player_hands = PlayerHands(players)
+        self.input_filters = [GestureFilter(pos) for pos in self.start_positions()]
+        # Per-stage frame timings; F3 toggles the overlay
+        self.profiler = FrameProfiler(enabled=profile, export_path=profile_out)
+        # Camera thumbnail with the hand skeleton, refreshed at a lower rate than the game
+        self.preview = PreviewRenderer((160, 120), fps=15)
         
         # Initialize game objects
-        self.spaceship = Spaceship((self.width//2, self.height - 50))
+        self.spaceships = self.new_spaceships()
         self.bullets = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
-        self.last_shot_time = 0
+        # Broadphase for collision checks against enemies, rebuilt every frame
+        self.enemy_grid = SpatialGrid(cell_size=64)
         self.shot_cooldown = 0.3  # seconds between shots
-        self.last_enemy_spawn = time.time()
+        self.game_time = 0.0  # seconds of gameplay, advanced by each frame's time
+        self.last_enemy_spawn = 0.0
         self.enemy_spawn_interval = 1.0  # spawn an enemy every 1 second
         self.score = 0
         
-        # Create a starfield background (list of [x, y] positions)
-        self.stars = [[random.randint(0, self.width), random.randint(0, self.height)] for _ in range(100)]
+        # Parallax starfield background
+        self.starfield = Starfield((self.width, self.height), count=stars)
+        self.frame_time = 1.0 / 60  # seconds taken by the previous frame
+    
+    def start_positions(self):
+        # Players start spread evenly along the bottom of the screen
+        return [(self.width * (i + 1) // (self.players + 1), self.height - 50) for i in range(self.players)]
+    
+    def new_spaceships(self):
+        return [Spaceship(pos, PLAYER_COLORS[i % len(PLAYER_COLORS)])
+                for i, pos in enumerate(self.start_positions())]
     
     def run(self):
         while True:
@@ -112,169 +191,199 @@ class SpaceGestureShooter:
                 self.game_loop()
             elif self.state == "GAMEOVER":
                 self.game_over_loop()
+            elif self.state == "QUIT":
+                self.cleanup()
     
     def menu_loop(self):
-        # Main menu loop
-        while self.state == "MENU":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.state = "GAME"
-            
-            self.screen.fill(BLACK)
-            title_text = self.font_large.render("Space Gesture Shooter", True, WHITE)
-            instr_text = self.font_small.render("Move your finger to steer. Pinch to shoot. Press ENTER to start.", True, WHITE)
-            self.screen.blit(title_text, ((self.width - title_text.get_width()) // 2, self.height // 3))
-            self.screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
-            pygame.display.flip()
-            self.clock.tick(30)
+        # Main menu: camera and tracking are paused and the screen is only
+        # redrawn when input arrives (or on the idle refresh timer)
+        self.pipeline.pause()
+        run_static_screen(self.draw_menu, self.handle_menu_event, lambda: self.state == "MENU",
+                          presented=self.startup.presented)
+    
+    def draw_menu(self, screen):
+        screen.fill(BLACK)
+        title_text = self.text.render(self.font_large, "Space Gesture Shooter", True, WHITE)
+        instr_text = self.text.render(self.font_small, "Move your finger to steer. Pinch to shoot. Press ENTER to start.", True, WHITE)
+        screen.blit(title_text, ((self.width - title_text.get_width()) // 2, self.height // 3))
+        screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2))
+    
+    def handle_menu_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.state = "GAME"
     
     def game_loop(self):
+        self.new_game()
+        self.pipeline.resume()
+        self.clock.tick()  # don't count the time spent idle as a frame
+        while self.state == "GAME":
+            self.game_frame()
+    
+    def new_game(self):
         # Reset objects for a new game
-        self.spaceship = Spaceship((self.width//2, self.height - 50))
-        self.bullets.empty()
-        self.enemies.empty()
+        self.spaceships = self.new_spaceships()
+        self.player_hands.reset()
+        # Kill rather than empty() so the sprites go back to their pools
+        bullet_pool.release_all(self.bullets)
+        enemy_pool.release_all(self.enemies)
         self.score = 0
-        self.last_shot_time = 0
-        self.last_enemy_spawn = time.time()
-        game_over = False
+        self.last_enemy_spawn = self.game_time
+    
+    def game_frame(self):
+        # Run one frame of gameplay: input, simulation and rendering
+        profiler = self.profiler
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.cleanup()
+            profiler.handle_event(event)
         
-        while self.state == "GAME":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-            
-            # Capture a frame from the webcam
-            ret, frame = self.cap.read()
-            if not ret:
+        # Read the latest gesture input without waiting on the camera
+        state = self.pipeline.latest()
+        player_hands = self.player_hands.assign(state.hands if state is not None else ())
+        inputs = [input_filter.update_hand(state, hand, predict=self.pipeline.realtime)
+                  for input_filter, hand in zip(self.input_filters, player_hands)]
+        profiler.add_pipeline(self.pipeline)
+        profiler.add("latency", max(input_filter.latency for input_filter in self.input_filters))
+        profiler.mark("input")
+        
+        current_time = self.game_time
+        for spaceship, (pinching, finger_pos) in zip(self.spaceships, inputs):
+            if spaceship.destroyed:
                 continue
-            frame = cv2.flip(frame, 1)  # Mirror view
-            results = self.get_hand_landmarks(frame)
-            pinch_distance, finger_pos = None, (self.width // 2, self.height // 2)
-            if results.multi_hand_landmarks:
-                for handLms in results.multi_hand_landmarks:
-                    pinch_distance, finger_pos = self.get_pinch_status(handLms)
-                    # Optionally, draw landmarks on the frame for debugging:
-                    mp_draw.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
-            
             # Update spaceship position based on finger position from camera
-            self.spaceship.update(finger_pos)
+            spaceship.update(finger_pos)
             
             # Fire a bullet if a pinch gesture is detected and cooldown has passed
-            current_time = time.time()
-            if pinch_distance is not None and pinch_distance < 0.05:
-                if current_time - self.last_shot_time > self.shot_cooldown:
-                    bullet = Bullet(self.spaceship.rect.midtop)
+            if pinching:
+                if current_time - spaceship.last_shot_time > self.shot_cooldown:
+                    bullet = bullet_pool.acquire(spaceship.rect.midtop)
                     self.bullets.add(bullet)
-                    self.last_shot_time = current_time
-            
-            # Update bullets and enemy positions
-            self.bullets.update()
-            self.enemies.update()
-            
-            # Spawn new enemies at intervals
-            if current_time - self.last_enemy_spawn > self.enemy_spawn_interval:
-                enemy_x = random.randint(20, self.width - 20)
-                enemy = Enemy((enemy_x, -20), random.randint(2, 5))
-                self.enemies.add(enemy)
-                self.last_enemy_spawn = current_time
-            
-            # Check for bullet-enemy collisions
-            for bullet in self.bullets:
-                hit_enemies = pygame.sprite.spritecollide(bullet, self.enemies, True)
-                if hit_enemies:
-                    bullet.kill()
-                    self.score += 10
-            
-            # Check if an enemy collides with the spaceship
-            if pygame.sprite.spritecollide(self.spaceship, self.enemies, False):
-                game_over = True
-            
-            if game_over:
-                self.state = "GAMEOVER"
-            
-            # Update starfield background (stars moving downward)
-            for star in self.stars:
-                star[1] += 1
-                if star[1] > self.height:
-                    star[0] = random.randint(0, self.width)
-                    star[1] = 0
-            
-            # -------------------- RENDERING --------------------
-            self.screen.fill(BLACK)
-            # Draw stars
-            for star in self.stars:
-                pygame.draw.circle(self.screen, WHITE, star, 2)
-            
-            # Draw game objects
-            self.spaceship.draw(self.screen)
-            for bullet in self.bullets:
-                bullet.draw(self.screen)
-            for enemy in self.enemies:
-                enemy.draw(self.screen)
-            
-            # Display current score
-            score_text = self.font_small.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
-            
-            # Show a small thumbnail of the camera feed in the corner
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(np.rot90(frame_rgb))
-            thumb = pygame.transform.scale(frame_surface, (160, 120))
-            self.screen.blit(thumb, (self.width - 170, 10))
-            
-            # Draw a red circle as a visual indicator if pinching
-            if pinch_distance is not None and pinch_distance < 0.05:
+                    spaceship.last_shot_time = current_time
+        
+        # Update bullets and enemy positions
+        self.bullets.update()
+        self.enemies.update()
+        
+        # Spawn new enemies at intervals
+        if current_time - self.last_enemy_spawn > self.enemy_spawn_interval:
+            enemy_x = random.randint(20, self.width - 20)
+            enemy = enemy_pool.acquire((enemy_x, -20), random.randint(2, 5))
+            self.enemies.add(enemy)
+            self.last_enemy_spawn = current_time
+        
+        # Check for bullet-enemy collisions
+        self.enemy_grid.rebuild(self.enemies)
+        for bullet in self.bullets:
+            hit_enemies = self.enemy_grid.query_rect(bullet.rect)
+            if hit_enemies:
+                for enemy in hit_enemies:
+                    enemy.kill()
+                    self.enemy_grid.remove(enemy)
+                bullet.kill()
+                self.score += 10
+        
+        # An enemy hitting a spaceship destroys it; the game is over when none are left
+        for spaceship in self.spaceships:
+            if not spaceship.destroyed and self.enemy_grid.query_rect(spaceship.rect):
+                spaceship.destroyed = True
+        if all(spaceship.destroyed for spaceship in self.spaceships):
+            self.state = "GAMEOVER"
+        
+        # Update starfield background (stars moving downward)
+        self.starfield.update(self.frame_time)
+        profiler.mark("simulation")
+        
+        # -------------------- RENDERING --------------------
+        # Draw stars; the farthest layer also clears the screen
+        self.starfield.draw(self.screen)
+        
+        # Draw game objects
+        for spaceship in self.spaceships:
+            if not spaceship.destroyed:
+                spaceship.draw(self.screen)
+        for bullet in self.bullets:
+            bullet.draw(self.screen)
+        for enemy in self.enemies:
+            enemy.draw(self.screen)
+        
+        # Display current score
+        score_text = self.text.render(self.font_small, f"Score: {self.score}", True, WHITE)
+        self.screen.blit(score_text, (10, 10))
+        
+        # Show a small thumbnail of the camera feed in the corner
+        if state is not None:
+            self.preview.update(state.frame, state.results.multi_hand_landmarks, state.seq)
+            self.preview.draw(self.screen, (self.width - 170, 10))
+        
+        # Draw a red circle as a visual indicator while a player pinches
+        for pinching, finger_pos in inputs:
+            if pinching:
                 pygame.draw.circle(self.screen, RED, finger_pos, 15)
-            
-            pygame.display.flip()
-            self.clock.tick(60)
+        profiler.draw(self.screen, (10, 40))
+        profiler.mark("render")
+        
+        pygame.display.flip()
+        self.startup.presented()
+        profiler.mark("flip")
+        profiler.end_frame()
+        self.frame_time = self.clock.tick(60) / 1000.0
+        self.game_time += self.frame_time
     
     def game_over_loop(self):
         # Display game-over screen with final score and restart prompt
-        while self.state == "GAMEOVER":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.cleanup()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.state = "MENU"
-            
-            self.screen.fill(BLACK)
-            over_text = self.font_large.render("GAME OVER", True, RED)
-            score_text = self.font_small.render(f"Final Score: {self.score}", True, WHITE)
-            instr_text = self.font_small.render("Press ENTER to return to menu", True, WHITE)
-            self.screen.blit(over_text, ((self.width - over_text.get_width()) // 2, self.height // 3))
-            self.screen.blit(score_text, ((self.width - score_text.get_width()) // 2, self.height // 2))
-            self.screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2 + 40))
-            pygame.display.flip()
-            self.clock.tick(30)
+        self.pipeline.pause()
+        run_static_screen(self.draw_game_over, self.handle_game_over_event, lambda: self.state == "GAMEOVER")
+    
+    def draw_game_over(self, screen):
+        screen.fill(BLACK)
+        over_text = self.text.render(self.font_large, "GAME OVER", True, RED)
+        score_text = self.text.render(self.font_small, f"Final Score: {self.score}", True, WHITE)
+        instr_text = self.text.render(self.font_small, "Press ENTER to return to menu", True, WHITE)
+        screen.blit(over_text, ((self.width - over_text.get_width()) // 2, self.height // 3))
+        screen.blit(score_text, ((self.width - score_text.get_width()) // 2, self.height // 2))
+        screen.blit(instr_text, ((self.width - instr_text.get_width()) // 2, self.height // 2 + 40))
+    
+    def handle_game_over_event(self, event):
+        if event.type == pygame.QUIT:
+            # Leave the static screen first; run() shuts down once it has returned
+            self.state = "QUIT"
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.state = "MENU"
     
     def get_hand_landmarks(self, frame):
         # Process the camera frame for hand landmarks using Mediapipe
+        import cv2  # loaded on the inference thread, not at startup
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(frame_rgb)
+        results = self.hands.process(frame_rgb)
         return results
     
-    def get_pinch_status(self, landmarks):
-        # Calculate distance between thumb tip and index finger tip to determine a pinch
-        thumb_tip = landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-        index_tip = landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        x1, y1 = thumb_tip.x, thumb_tip.y
-        x2, y2 = index_tip.x, index_tip.y
-        dist = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        # Convert the index tip coordinates to screen space
-        finger_pos = (int(index_tip.x * self.width), int(index_tip.y * self.height))
-        return dist, finger_pos
-    
     def cleanup(self):
-        self.cap.release()
+        self.pipeline.stop()
+        if self.detector is not None:
+            self.detector.close()
+        self.profiler.close()
         pygame.quit()
         sys.exit()
 
 # -------------------- ENTRY POINT --------------------
 if __name__ == "__main__":
-    game = SpaceGestureShooter()
+    parser = argparse.ArgumentParser(description="Space Gesture Shooter")
+    add_input_arguments(parser)
+    add_profiler_arguments(parser)
+    parser.add_argument("--stars", type=int, default=300, help="number of background stars (default 300)")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1,
+                        help="local players, one hand each (default 1)")
+    args = parser.parse_args()
+    seed_random(args)
+    game = SpaceGestureShooter(record=args.record, replay=args.replay, realtime=not args.fast,
+                               profile=args.profile, profile_out=args.profile_out, stars=args.stars,
+                               players=args.players, inference_process=args.inference_process)
     game.run()
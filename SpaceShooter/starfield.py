@@ -0,0 +1,99 @@
+# starfield.py
+import numpy as np
+import pygame
+
+BLACK = (0, 0, 0)
+
+# (speed in pixels per second, share of the stars, star size in pixels, colour), far to near
+DEFAULT_LAYERS = (
+    (30.0, 0.5, 1, (110, 110, 130)),
+    (60.0, 0.3, 2, (180, 180, 200)),
+    (120.0, 0.2, 3, (255, 255, 255)),
+)
+
+# Height in pixels of the strips each layer is cut into
+STRIP_HEIGHT = 64
+
+
+class Starfield:
+    # Parallax starfield scrolling downward.
+    # Each layer is a loop of horizontal strips, two more than it takes to
+    # cover the screen, that scrolls by the layer's offset. Its stars are kept
+    # in NumPy arrays and written into the strip surfaces with surfarray.
+    # update() advances every layer's offset in one vectorized step. A strip
+    # that has just scrolled off the bottom of the screen is off screen until
+    # it comes back in at the top; in between, its stars are scattered anew
+    # and the strip is rebuilt, so the pattern never repeats. Only those
+    # strips are ever redrawn, and draw() just blits the strips, so the
+    # per-frame cost barely depends on the number of stars.
+    def __init__(self, size, count=300, layers=DEFAULT_LAYERS, seed=None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        width, height = size
+        self.strips = -(-height // STRIP_HEIGHT) + 2
+        self.loop_height = self.strips * STRIP_HEIGHT
+        self.speeds = np.array([layer[0] for layer in layers], dtype=np.float64)
+        self.offsets = np.zeros(len(layers), dtype=np.float64)
+        self.layers = []
+        self.surfaces = []
+        for i, (speed, share, star_size, color) in enumerate(layers):
+            n = max(1, int(count * share))
+            xs = np.empty(n, dtype=np.int64)
+            ys = self.rng.integers(0, self.strips, n) * STRIP_HEIGHT
+            self.layers.append((xs, ys, star_size, color))
+            self._scatter(i, np.ones(n, dtype=bool))
+            self.surfaces.append([self._render_strip(i, strip) for strip in range(self.strips)])
+
+    def _scatter(self, i, stars):
+        # New random positions for the given stars, each within its strip.
+        xs, ys, star_size, _ = self.layers[i]
+        n = int(stars.sum())
+        xs[stars] = self.rng.integers(0, self.size[0], n)
+        ys[stars] = ys[stars] // STRIP_HEIGHT * STRIP_HEIGHT + self.rng.integers(0, STRIP_HEIGHT - star_size + 1, n)
+
+    def _render_strip(self, i, strip):
+        xs, ys, star_size, color = self.layers[i]
+        top = strip * STRIP_HEIGHT
+        inside = (ys >= top) & (ys < top + STRIP_HEIGHT)
+        xs, ys = xs[inside], ys[inside] - top
+        surface = pygame.Surface((self.size[0], STRIP_HEIGHT)).convert()
+        surface.fill(BLACK)
+        pixels = pygame.surfarray.pixels3d(surface)
+        # Stars are star_size x star_size squares, wrapped horizontally
+        for dx in range(star_size):
+            for dy in range(star_size):
+                pixels[(xs + dx) % self.size[0], ys + dy] = color
+        del pixels  # release the surface lock
+        # The farthest layer is opaque and doubles as the background fill
+        if i > 0:
+            surface.set_colorkey(BLACK, pygame.RLEACCEL)
+        return surface
+
+    def __len__(self):
+        return sum(len(xs) for xs, _, _, _ in self.layers)
+
+    def update(self, dt):
+        before = self.offsets.astype(np.int64)
+        self.offsets += self.speeds * dt
+        self.offsets %= self.loop_height
+        moved = (self.offsets.astype(np.int64) - before) % self.loop_height
+        tops = np.arange(self.strips) * STRIP_HEIGHT
+        # A strip's top is drawn at screen row (top + offset) % loop_height; it
+        # has gone off the bottom once that row reaches the screen height.
+        passed = (self.size[1] - tops[None, :] - before[:, None]) % self.loop_height
+        gone = (passed > 0) & (passed <= moved[:, None])
+        for i, strip in zip(*np.nonzero(gone)):
+            i, strip = int(i), int(strip)
+            ys = self.layers[i][1]
+            self._scatter(i, ys // STRIP_HEIGHT == strip)
+            self.surfaces[i][strip] = self._render_strip(i, strip)
+
+    def draw(self, surface):
+        height = self.size[1]
+        for strips, offset in zip(self.surfaces, self.offsets.astype(np.int32).tolist()):
+            for strip, image in enumerate(strips):
+                y = (strip * STRIP_HEIGHT + offset) % self.loop_height
+                if y < height:
+                    surface.blit(image, (0, y))
+                if y + STRIP_HEIGHT > self.loop_height:
+                    surface.blit(image, (0, y - self.loop_height))
@@ -0,0 +1,148 @@
+# benchmarks/bench_games.py
+# Headless frame-time benchmarks for the three game loops, driven by replayed
+# landmarks (synthetic by default) with the frame limiter disabled.
+#
+#   python benchmarks/bench_games.py [--replay PATH] [--frames N] [--json out.json]
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from harness import (BenchClock, PUZZLE_DIR, measure, print_table, synthetic_recording, write_json)
+
+REALM_ENEMIES = (10, 100, 1000)
+SHOOTER_ENEMIES = (10, 100, 1000)
+PUZZLE_GRIDS = (3, 10, 20, 50)
+
+
+def bench_realm(replay, frames, warmup, enemy_store=False):
+    from engine.game import RealmOfGesturesGame
+    from engine.enemy_store import EnemyStore
+    from config import WORLD_WIDTH, WORLD_HEIGHT
+
+    game = RealmOfGesturesGame(replay=replay, realtime=False)
+    game.clock = BenchClock()
+    game.enemy_store = EnemyStore() if enemy_store else None
+    rows = []
+    for count in REALM_ENEMIES:
+        rng = random.Random(count)
+        game.pipeline.rewind()
+        game.new_game()
+        game.state = "GAME"
+        game.player.health = 10 ** 9  # keep playing through enemy contact
+        game.enemy_spawn_interval = float("inf")
+
+        def enemies():
+            return len(game.enemy_store) if game.enemy_store is not None else len(game.enemies)
+
+        def top_up():
+            # Hold the wave size steady as enemies reach the player or die.
+            for _ in range(count - enemies()):
+                game.spawn_enemy((rng.randint(0, WORLD_WIDTH), rng.randint(0, WORLD_HEIGHT)))
+
+        stats = measure(game.game_frame, frames, warmup, before=top_up,
+                        count=lambda: enemies() + len(game.projectiles))
+        label = "store" if enemy_store else "sprites"
+        rows.append((f"realm {label} {count} enemies", stats))
+    game.pipeline.stop()
+    return rows
+
+
+def bench_shooter(replay, frames, warmup):
+    from space_gesture_shooter import SpaceGestureShooter, enemy_pool
+
+    game = SpaceGestureShooter(replay=replay, realtime=False)
+    game.clock = BenchClock()
+    rows = []
+    for count in SHOOTER_ENEMIES:
+        rng = random.Random(count)
+        game.pipeline.rewind()
+        game.new_game()
+        game.enemy_spawn_interval = float("inf")
+
+        def top_up():
+            for _ in range(count - len(game.enemies)):
+                pos = (rng.randint(20, game.width - 20), rng.randint(-game.height, 0))
+                game.enemies.add(enemy_pool.acquire(pos, rng.randint(2, 5)))
+
+        stats = measure(game.game_frame, frames, warmup, before=top_up,
+                        count=lambda: len(game.enemies) + len(game.bullets))
+        rows.append((f"shooter {count} enemies", stats))
+    game.pipeline.stop()
+    return rows
+
+
+def bench_puzzle(replay, frames, warmup):
+    cwd = os.getcwd()
+    os.chdir(PUZZLE_DIR)  # the puzzle loads its images from the working directory
+    try:
+        from pinch_puzzle import PinchPuzzleDeluxe
+        game = PinchPuzzleDeluxe(replay=replay, realtime=False)
+    finally:
+        os.chdir(cwd)
+    game.clock = BenchClock()
+    rows = []
+    for size in PUZZLE_GRIDS:
+        for dirty_rects in (True, False):
+            random.seed(size)
+            game.pipeline.rewind()
+            game.dirty_rects = dirty_rects
+            game.set_grid(size)
+            game.state = "GAME"
+            stats = measure(game.game_frame, frames, warmup, count=lambda: len(game.pieces))
+            label = "dirty rects" if dirty_rects else "full redraw"
+            rows.append((f"puzzle {size}x{size} {label}", stats))
+    game.pipeline.stop()
+    return rows
+
+
+def pool_stats():
+    # Sprite pool counters of whichever games were benchmarked.
+    pools = {}
+    if "engine.enemy" in sys.modules:
+        pools["realm enemies"] = sys.modules["engine.enemy"].enemy_pool.stats()
+        pools["realm projectiles"] = sys.modules["engine.projectile"].projectile_pool.stats()
+    if "space_gesture_shooter" in sys.modules:
+        shooter = sys.modules["space_gesture_shooter"]
+        pools["shooter enemies"] = shooter.enemy_pool.stats()
+        pools["shooter bullets"] = shooter.bullet_pool.stats()
+    return pools
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless game-loop benchmarks")
+    parser.add_argument("--replay", metavar="PATH", help="landmark recording to drive input (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed frames before each scenario")
+    parser.add_argument("--only", choices=("realm", "shooter", "puzzle"), help="run a single game")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replay = args.replay or synthetic_recording(os.path.join(tmp, "synthetic.hlmk"),
+                                                    frames=args.frames + args.warmup)
+        results = {}
+        if args.only in (None, "realm"):
+            results["realm"] = bench_realm(replay, args.frames, args.warmup)
+            results["realm_store"] = bench_realm(replay, args.frames, args.warmup, enemy_store=True)
+        if args.only in (None, "shooter"):
+            results["shooter"] = bench_shooter(replay, args.frames, args.warmup)
+        if args.only in (None, "puzzle"):
+            results["puzzle"] = bench_puzzle(replay, args.frames, args.warmup)
+
+    for name, rows in results.items():
+        print_table(name, rows)
+    pools = pool_stats()
+    if pools:
+        print("\nsprite pools")
+        for name, stats in pools.items():
+            print(f"  {name:<20}" + "  ".join(f"{key}={value}" for key, value in stats.items()))
+    if args.json:
+        output = {name: dict(rows) for name, rows in results.items()}
+        output["pools"] = pools
+        write_json(args.json, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/bench_micro.py
+# Microbenchmarks for the hot spots of the game loops: drawing the Realm world,
+# enemy pathing and collision checks, the camera preview and the shooter's
+# starfield. Each one is timed next to the
+# straightforward implementation it replaced, as a reference point.
+#
+#   python benchmarks/bench_micro.py [--iterations N] [--json out.json]
+import argparse
+import itertools
+import random
+
+from harness import measure, print_table, write_json
+
+import cv2
+import numpy as np
+import pygame
+
+
+def bench_world_draw(iterations):
+    from config import SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, TILE_SIZE, TILES_X, TILES_Y, TILE_COLORS, BLACK
+    from engine.world import World
+
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    world = World()
+    tile_map = world.tiles(0, 0, TILES_X, TILES_Y)
+    offsets = [pygame.Vector2(random.randint(0, WORLD_WIDTH - SCREEN_WIDTH), random.randint(0, WORLD_HEIGHT - SCREEN_HEIGHT))
+               for _ in range(64)]
+
+    def per_tile(surface, offset):
+        start_x, start_y = int(offset.x // TILE_SIZE), int(offset.y // TILE_SIZE)
+        end_x = min(TILES_X, int((offset.x + surface.get_width()) // TILE_SIZE) + 1)
+        end_y = min(TILES_Y, int((offset.y + surface.get_height()) // TILE_SIZE) + 1)
+        for y in range(start_y, end_y):
+            for x in range(start_x, end_x):
+                rect = pygame.Rect(x * TILE_SIZE - int(offset.x), y * TILE_SIZE - int(offset.y), TILE_SIZE, TILE_SIZE)
+                pygame.draw.rect(surface, TILE_COLORS[tile_map[y, x]], rect)
+                pygame.draw.rect(surface, BLACK, rect, 1)
+
+    tick = itertools.count()
+    rows = [
+        ("world.draw chunked", measure(lambda: world.draw(screen, offsets[next(tick) % 64]), iterations, warmup=64)),
+        ("world.draw per-tile (reference)", measure(lambda: per_tile(screen, offsets[next(tick) % 64]), iterations)),
+    ]
+    # Streaming: a camera moving diagonally through an unbounded world, with
+    # chunks built ahead of it and older ones evicted.
+    streaming = World(cache_size=32, bounded=False)
+    camera = pygame.Vector2(0, 0)
+    velocity = pygame.Vector2(300, 200)
+
+    def stream_step():
+        camera.update(camera + velocity / 60)
+        streaming.update(camera, screen.get_size(), velocity)
+        streaming.draw(screen, camera)
+
+    rows.append(("world stream 300x200 px/s", measure(stream_step, iterations, warmup=10)))
+    return rows
+
+
+def bench_flow_field(iterations):
+    from config import TILE_SIZE, WORLD_WIDTH, WORLD_HEIGHT
+    from engine.world import World
+    from engine.flow_field import FlowField
+
+    pygame.display.set_mode((800, 600))
+    field = FlowField(World())
+    rng = np.random.default_rng(0)
+    goals = rng.uniform(0, (WORLD_WIDTH, WORLD_HEIGHT), (64, 2))
+    positions = rng.uniform(0, (WORLD_WIDTH, WORLD_HEIGHT), (1000, 2))
+    field.update(goals[:1])
+    tick = itertools.count()
+
+    def build(players):
+        i = next(tick)
+        field.build(tuple(tuple((goals[(i + k) % 64] // TILE_SIZE).astype(int)) for k in range(players)))
+
+    # What a simulation step pays: players walking at 180 px/s, with each
+    # rebuild spread over the following steps.
+    walking = [FlowField(World()) for _ in range(2)]
+    steps = itertools.count()
+
+    def walk(players):
+        x = 3 * next(steps)
+        walking[players - 1].update([(100 + x % 1800, 700), (1900 - x % 1800, 1300)][:players])
+
+    return [
+        ("flow field build (player changes tile)", measure(lambda: build(1), iterations)),
+        ("flow field build, two players", measure(lambda: build(2), iterations)),
+        ("flow field step, walking", measure(lambda: walk(1), iterations, warmup=1)),
+        ("flow field step, two walking", measure(lambda: walk(2), iterations, warmup=1)),
+        ("flow field lookup 1000 enemies", measure(lambda: field.directions_at(positions), iterations)),
+    ]
+
+
+def bench_collisions(iterations):
+    from shared.spatial import SpatialGrid
+
+    class Box(pygame.sprite.Sprite):
+        def __init__(self, x, y, size):
+            super().__init__()
+            self.rect = pygame.Rect(x, y, size, size)
+
+    rows = []
+    # 1000x500: many projectiles, where each query's cost matters more than the rebuild.
+    for count, shots in ((100, 50), (1000, 50), (5000, 50), (1000, 500)):
+        rng = random.Random(count)
+        enemies = pygame.sprite.Group(Box(rng.randint(0, 2000), rng.randint(0, 2000), 40) for _ in range(count))
+        projectiles = [Box(rng.randint(0, 2000), rng.randint(0, 2000), 10) for _ in range(shots)]
+        grid = SpatialGrid(cell_size=64)
+
+        def grid_step():
+            grid.rebuild(enemies)
+            for projectile in projectiles:
+                grid.query_rect(projectile.rect)
+
+        def brute_step():
+            for projectile in projectiles:
+                pygame.sprite.spritecollide(projectile, enemies, False)
+
+        rows.append((f"collide grid {count}x{shots}", measure(grid_step, iterations, count=lambda: count)))
+        rows.append((f"collide spritecollide {count}x{shots}", measure(brute_step, iterations, count=lambda: count)))
+    return rows
+
+
+def bench_preview(iterations):
+    from shared.preview import PreviewRenderer
+
+    pygame.display.set_mode((800, 600))
+    frame = np.random.default_rng(0).integers(0, 255, (768, 1024, 3), dtype=np.uint8)
+    preview = PreviewRenderer((200, 150), fps=0)
+
+    def legacy():
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame_surface = pygame.surfarray.make_surface(np.rot90(frame_rgb))
+        pygame.transform.scale(frame_surface, (200, 150))
+
+    return [
+        ("preview renderer 1024x768", measure(lambda: preview.update(frame), iterations, warmup=10)),
+        ("preview cvtColor/rot90/scale (reference)", measure(legacy, iterations, warmup=10)),
+    ]
+
+
+def bench_starfield(iterations):
+    from starfield import Starfield
+
+    screen = pygame.display.set_mode((800, 600))
+    rows = []
+    for count in (100, 1000, 5000):
+        starfield = Starfield((800, 600), count=count, seed=count)
+        stars = [[random.randint(0, 800), random.randint(0, 600)] for _ in range(count)]
+
+        def layered():
+            starfield.update(1.0 / 60)
+            starfield.draw(screen)
+
+        def per_star():
+            screen.fill((0, 0, 0))
+            for star in stars:
+                star[1] += 1
+                if star[1] > 600:
+                    star[0] = random.randint(0, 800)
+                    star[1] = 0
+                pygame.draw.circle(screen, (255, 255, 255), star, 2)
+
+        rows.append((f"starfield layers {count}", measure(layered, iterations, count=lambda: count)))
+        rows.append((f"starfield per-star loop {count} (reference)", measure(per_star, iterations, count=lambda: count)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game-loop microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=500, help="timed calls per benchmark")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    pygame.init()
+    random.seed(0)
+    results = {
+        "world_draw": bench_world_draw(args.iterations),
+        "flow_field": bench_flow_field(args.iterations),
+        "collisions": bench_collisions(args.iterations),
+        "preview": bench_preview(args.iterations),
+        "starfield": bench_starfield(args.iterations),
+    }
+    for name, rows in results.items():
+        print_table(name, rows)
+    if args.json:
+        write_json(args.json, {name: dict(rows) for name, rows in results.items()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/harness.py
+# Shared setup for the headless benchmarks: dummy SDL drivers, import paths for
+# the three games, synthetic hand input and frame-time statistics.
+import json
+import math
+import os
+import sys
+import time
+
+# Must be set before pygame initializes its display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+REALM_DIR = os.path.join(ROOT, "Realm")
+SHOOTER_DIR = os.path.join(ROOT, "SpaceShooter")
+PUZZLE_DIR = os.path.join(ROOT, "ArrangeThePuzzle")
+for path in (ROOT, REALM_DIR, SHOOTER_DIR, PUZZLE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import numpy as np
+
+from shared.replay import LandmarkRecorder, LockstepClock
+
+PERCENTILES = (50, 90, 99)
+
+
+# Never sleeps and always reports a 60 FPS frame.
+BenchClock = LockstepClock
+
+
+def hand_template():
+    # A rough open hand in normalized coordinates, wrist at the origin:
+    # five fingers of four joints fanned out upwards.
+    points = [(0.0, 0.0, 0.0)]
+    for finger in range(5):
+        angle = math.radians(-60 + finger * 30)
+        for joint in range(1, 5):
+            r = 0.03 + 0.025 * joint
+            points.append((r * math.sin(angle), -r * math.cos(angle), -0.01 * joint))
+    return np.array(points, dtype=np.float32)
+
+
+def synthetic_recording(path, frames=1200, fps=60, seed=0):
+    # Write a landmark recording where the hand sweeps a Lissajous curve over
+    # the frame and pinches for 45 frames out of every 90.
+    rng = np.random.default_rng(seed)
+    template = hand_template()
+    recorder = LandmarkRecorder(path)
+    for i in range(frames):
+        t = i / fps
+        center = np.array([0.5 + 0.3 * math.sin(1.3 * t), 0.6 + 0.25 * math.sin(1.7 * t), 0.0], dtype=np.float32)
+        points = template + center + rng.normal(0, 0.002, template.shape).astype(np.float32)
+        if (i // 45) % 2:
+            points[4] = points[8] + (0.01, 0.01, 0.0)
+        dist = float(np.hypot(*(points[8, :2] - points[4, :2])))
+        recorder.write(t, [points], dist)
+    recorder.close()
+    return path
+
+
+def summarize(samples, entities=None):
+    # Frame-time percentiles in milliseconds, plus entity throughput if counts were given.
+    ms = np.asarray(samples) * 1000.0
+    stats = {f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES}
+    stats["mean_ms"] = float(ms.mean())
+    stats["max_ms"] = float(ms.max())
+    stats["fps"] = float(1000.0 / ms.mean()) if ms.mean() > 0 else float("inf")
+    if entities is not None:
+        stats["entities_per_s"] = float(np.sum(entities) / np.sum(samples))
+    return stats
+
+
+def measure(step, frames, warmup=0, before=None, count=None):
+    # Time `frames` calls of step() after `warmup` untimed calls. before() runs
+    # untimed ahead of every call; count() reports the entities processed.
+    for _ in range(warmup):
+        if before is not None:
+            before()
+        step()
+    samples, entities = [], []
+    for _ in range(frames):
+        if before is not None:
+            before()
+        if count is not None:
+            entities.append(count())
+        start = time.perf_counter()
+        step()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, entities if count is not None else None)
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"  {'scenario':<32}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'ent/s':>12}")
+    for name, stats in rows:
+        eps = stats.get("entities_per_s")
+        eps = f"{eps:>12.0f}" if eps is not None else f"{'-':>12}"
+        print(f"  {name:<32}{stats['p50_ms']:>9.3f}{stats['p90_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+              f"{stats['max_ms']:>9.3f}{eps}")
+
+
+def write_json(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,2 @@
+# shared/__init__.py
+# Helpers shared by the gesture-controlled games (input pipeline, rendering utilities).
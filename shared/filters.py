@@ -0,0 +1,98 @@
+# shared/filters.py
+import math
+import time
+
+import numpy as np
+
+from shared.gestures import GestureRecognizer
+
+
+class OneEuroFilter:
+    # One-Euro filter (Casiez et al.) for a point of any dimension.
+    # A low-pass filter whose cutoff rises with speed: slow movements are
+    # smoothed hard (no jitter), fast ones barely at all (little lag). The
+    # filtered derivative is kept in `velocity` (units per second).
+    def __init__(self, min_cutoff=1.5, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.value = None
+        self.velocity = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, t, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self.t is None:
+            self.t, self.value, self.velocity = t, x, np.zeros_like(x)
+            return self.value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.velocity = a_d * (x - self.value) / dt + (1.0 - a_d) * self.velocity
+        cutoff = self.min_cutoff + self.beta * float(np.linalg.norm(self.velocity))
+        a = self._alpha(cutoff, dt)
+        self.value = a * x + (1.0 - a) * self.value
+        self.t = t
+        return self.value
+
+
+class GestureFilter:
+    # Turns raw GestureStates into (pinching, finger_pos) for the game loop.
+    # The hand's pose is classified along the way (see GestureRecognizer in
+    # shared/gestures.py); `gesture` holds the current one, or None.
+    # The fingertip goes through a One-Euro filter once per new tracking
+    # result. With predict on, the filtered position is then extrapolated
+    # along the filtered velocity by the measured delay since the frame was
+    # captured (capped at max_prediction seconds), so the cursor stays close
+    # to the hand despite capture and inference latency. When no hand is
+    # tracked, or another hand takes over, the filters reset, and while there
+    # is no hand default_pos is returned. update() follows the state's first
+    # hand; update_hand() follows the given one (one filter per player).
+    def __init__(self, default_pos, press=0.05, release=0.065, min_cutoff=1.5, beta=0.01,
+                 max_prediction=0.1):
+        self.default_pos = default_pos
+        self.max_prediction = max_prediction
+        self.pointer = OneEuroFilter(min_cutoff, beta)
+        self.recognizer = GestureRecognizer(press, release)
+        self.gesture = None
+        self.latency = 0.0  # seconds from capture to the latest update() call
+        self._seq = None
+        self._hand_id = None
+
+    def reset(self):
+        self.pointer.reset()
+        self.recognizer.reset()
+        self.gesture = None
+        self._seq = None
+        self._hand_id = None
+
+    def update(self, state, predict=True):
+        hand = state.hands[0] if state is not None and state.hands else None
+        return self.update_hand(state, hand, predict)
+
+    def update_hand(self, state, hand, predict=True):
+        # hand is one of state.hands, or None when this player has no hand.
+        if state is None or hand is None:
+            self.reset()
+            return False, self.default_pos
+        if hand.id != self._hand_id:
+            self.reset()
+            self._hand_id = hand.id
+        if state.seq != self._seq:
+            self._seq = state.seq
+            self.pointer(state.timestamp, hand.finger_pos)
+            self.gesture = self.recognizer.update(hand.features)
+        pos = self.pointer.value
+        if predict:
+            self.latency = max(0.0, time.perf_counter() - state.timestamp)
+            pos = pos + self.pointer.velocity * min(self.latency, self.max_prediction)
+        return self.gesture == "pinch", (int(round(pos[0])), int(round(pos[1])))
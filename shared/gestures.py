@@ -0,0 +1,116 @@
+# shared/gestures.py
+from collections import namedtuple
+
+import numpy as np
+
+# Landmark indices (mp.solutions.hands.HandLandmark), so that reading
+# landmarks doesn't require importing mediapipe.
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_TIP = 16
+PINKY_TIP = 20
+
+# Fingertips, thumb first; rows and columns of HandFeatures.tip_distances.
+TIPS = np.array([THUMB_TIP, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP])
+
+# The three joints of each finger, thumb first, as (previous, joint, next)
+# landmarks; the angle at a joint is pi when the finger is straight there.
+JOINTS = np.array([
+    (0, 1, 2), (1, 2, 3), (2, 3, 4),
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),
+    (0, 9, 10), (9, 10, 11), (10, 11, 12),
+    (0, 13, 14), (13, 14, 15), (14, 15, 16),
+    (0, 17, 18), (17, 18, 19), (18, 19, 20),
+])
+
+# Mean joint angle (radians) at which each finger counts as fully curled and
+# fully straight; the thumb bends much less than the other fingers.
+CURLED = np.radians([130.0, 100.0, 100.0, 100.0, 100.0])
+STRAIGHT = np.radians([165.0, 160.0, 160.0, 160.0, 160.0])
+
+# Everything the games read from one detected hand.
+#   points         (21, 3) float32 landmarks in normalized coordinates
+#   tip_distances  (5, 5) distances between the fingertips in the image plane
+#   angles         (15,) joint angles in radians, in JOINTS order
+#   straightness   (5,) per finger, 0 when curled to 1 when straight
+#   pinch_distance thumb tip to index tip, as a float
+HandFeatures = namedtuple("HandFeatures", ["points", "tip_distances", "angles", "straightness", "pinch_distance"])
+
+GESTURES = ("pinch", "fist", "open", "point")
+
+
+def hand_points(hand):
+    # (21, 3) landmark array for a detected hand. Replayed and out-of-process
+    # hands already carry one; MediaPipe's are read out once here.
+    points = getattr(hand, "points", None)
+    if points is not None:
+        return points
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand.landmark], dtype=np.float32)
+
+
+def hand_features(points):
+    # All fingertip distances and joint angles of one hand in a few array operations.
+    tips = points[TIPS, :2]
+    offsets = tips[:, None, :] - tips[None, :, :]
+    tip_distances = np.sqrt((offsets ** 2).sum(axis=2))
+
+    before = points[JOINTS[:, 0]] - points[JOINTS[:, 1]]
+    after = points[JOINTS[:, 2]] - points[JOINTS[:, 1]]
+    norms = np.linalg.norm(before, axis=1) * np.linalg.norm(after, axis=1)
+    cos = (before * after).sum(axis=1) / np.maximum(norms, 1e-9)
+    angles = np.arccos(np.clip(cos, -1.0, 1.0))
+
+    bend = angles.reshape(5, 3).mean(axis=1)
+    straightness = np.clip((bend - CURLED) / (STRAIGHT - CURLED), 0.0, 1.0)
+    return HandFeatures(points, tip_distances, angles, straightness, float(tip_distances[0, 1]))
+
+
+def screen_position(features, size, landmark=INDEX_FINGER_TIP):
+    # Pixel position of a landmark on a screen of the given (width, height).
+    x, y = features.points[landmark, :2].tolist()
+    return int(x * size[0]), int(y * size[1])
+
+
+def gesture_scores(features):
+    # 0..1 confidence for each gesture other than pinch, from finger straightness.
+    thumb, index, middle, ring, pinky = features.straightness.tolist()
+    others = max(middle, ring, pinky)
+    return {
+        "fist": 1.0 - max(index, others),
+        "open": min(thumb, index, middle, ring, pinky),
+        "point": min(index, 1.0 - others),
+    }
+
+
+class GestureRecognizer:
+    # Classifies one hand, result by result, as one of GESTURES or None.
+    # A pinch starts when the thumb-index distance drops below press, ends
+    # only once it rises above release, and takes precedence over the rest.
+    # The other gestures are scored from the finger straightness; one becomes
+    # active once its score reaches enter and stays active until it drops
+    # below exit, so a hand held between two poses doesn't flicker.
+    def __init__(self, press=0.05, release=0.065, enter=0.7, exit=0.4):
+        self.press = press
+        self.release = release
+        self.enter = enter
+        self.exit = exit
+        self.active = None
+
+    def reset(self):
+        self.active = None
+
+    def update(self, features):
+        if features is None:
+            self.active = None
+            return None
+        if features.pinch_distance < (self.release if self.active == "pinch" else self.press):
+            self.active = "pinch"
+            return self.active
+        scores = gesture_scores(features)
+        if self.active in scores and scores[self.active] >= self.exit:
+            return self.active
+        best = max(scores, key=scores.get)
+        self.active = best if scores[best] >= self.enter else None
+        return self.active
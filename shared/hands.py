@@ -0,0 +1,109 @@
+# shared/hands.py
+from collections import namedtuple
+
+from shared.gestures import WRIST, hand_features, hand_points, screen_position
+
+# One hand from a tracking result. id stays the same for as long as the hand
+# is followed from frame to frame; landmarks is MediaPipe's hand (or the replay
+# stand-in) and features its HandFeatures (shared/gestures.py). finger_pos is
+# the index fingertip in screen pixels.
+TrackedHand = namedtuple("TrackedHand", ["id", "landmarks", "pinch_distance", "finger_pos", "features"])
+
+# Wrist and the four finger bases: their mean is a stable palm center that
+# doesn't jump when the fingers move.
+PALM = [WRIST, 5, 9, 13, 17]
+
+
+def palm_center(points):
+    return tuple(points[PALM, :2].mean(axis=0).tolist())
+
+
+class HandTracker:
+    # Gives the hands in successive tracking results stable IDs.
+    # MediaPipe reports all hands of a frame from one process() call, but in
+    # no particular order. Each hand is matched to the track whose predicted
+    # palm center (last center plus last per-result motion) is nearest, closest
+    # pairs first, within max_jump (in normalized frame units). Hands left over
+    # start new tracks; a track missing for more than max_missed results is
+    # dropped, so a hand lost for a frame or two keeps its ID. With at most a
+    # handful of hands, comparing every pair is cheaper than anything cleverer.
+    def __init__(self, max_jump=0.25, max_missed=3):
+        self.max_jump = max_jump
+        self.max_missed = max_missed
+        self.tracks = {}  # id -> [center, velocity, results missed]
+        self.next_id = 1
+
+    def reset(self):
+        self.tracks.clear()
+
+    def update(self, centers):
+        # Track IDs for hands at the given palm centers, in the same order.
+        pairs = []
+        for track_id, (center, velocity, missed) in self.tracks.items():
+            steps = missed + 1
+            px, py = center[0] + velocity[0] * steps, center[1] + velocity[1] * steps
+            for i, (x, y) in enumerate(centers):
+                distance = ((x - px) ** 2 + (y - py) ** 2) ** 0.5
+                if distance <= self.max_jump:
+                    pairs.append((distance, track_id, i))
+        pairs.sort()
+
+        matched = {}  # hand index -> track id
+        used = set()
+        for _, track_id, i in pairs:
+            if i not in matched and track_id not in used:
+                matched[i] = track_id
+                used.add(track_id)
+
+        for track_id, track in list(self.tracks.items()):
+            if track_id not in used:
+                track[2] += 1
+                if track[2] > self.max_missed:
+                    del self.tracks[track_id]
+        for i, center in enumerate(centers):
+            track_id = matched.get(i)
+            if track_id is None:
+                track_id = matched[i] = self.next_id
+                self.next_id += 1
+                self.tracks[track_id] = [center, (0.0, 0.0), 0]
+            else:
+                old, _, missed = self.tracks[track_id]
+                steps = missed + 1
+                velocity = ((center[0] - old[0]) / steps, (center[1] - old[1]) / steps)
+                self.tracks[track_id] = [center, velocity, 0]
+        return [matched[i] for i in range(len(centers))]
+
+
+def track_hands(tracker, results, screen_size):
+    # TrackedHands for a tracking result, oldest track first. Each hand's
+    # landmarks are read into an array once and everything else comes from it.
+    found = results.multi_hand_landmarks or ()
+    features = [hand_features(hand_points(hand)) for hand in found]
+    ids = tracker.update([palm_center(f.points) for f in features])
+    hands = [TrackedHand(hand_id, hand, f.pinch_distance, screen_position(f, screen_size), f)
+             for hand_id, hand, f in zip(ids, found, features)]
+    return tuple(sorted(hands, key=lambda hand: hand.id))
+
+
+class PlayerHands:
+    # Binds tracked hands to a fixed number of local players.
+    # A player keeps its hand for as long as that hand's ID is tracked. Players
+    # without a hand pick up unclaimed hands left to right on screen, so with
+    # two people side by side, player 1 is the one on the left.
+    def __init__(self, count):
+        self.ids = [None] * count
+
+    def reset(self):
+        self.ids = [None] * len(self.ids)
+
+    def assign(self, hands):
+        # One TrackedHand (or None) per player.
+        by_id = {hand.id: hand for hand in hands}
+        assigned = [by_id.get(hand_id) for hand_id in self.ids]
+        claimed = {hand.id for hand in assigned if hand is not None}
+        free = sorted((hand for hand in hands if hand.id not in claimed), key=lambda hand: hand.finger_pos[0])
+        for i, hand in enumerate(assigned):
+            if hand is None and free:
+                assigned[i] = free.pop(0)
+        self.ids = [hand.id if hand is not None else None for hand in assigned]
+        return assigned
@@ -0,0 +1,35 @@
+# shared/idle.py
+import pygame
+
+# Posted by a timer while a static screen is up, so it is repainted now and
+# then (e.g. after the window was uncovered) without redrawing every frame.
+IDLE_REFRESH = pygame.event.custom_type()
+IDLE_REFRESH_MS = 1000
+
+
+def run_static_screen(draw, handle_event, active, refresh_ms=IDLE_REFRESH_MS, presented=None):
+    # Show a screen that only changes in response to input (menus, game over).
+    # draw(screen) paints it once; the loop then sleeps in pygame.event.wait()
+    # and wakes up only for input or the refresh timer, instead of repainting
+    # at a fixed frame rate. Runs while active() is true. presented(), if
+    # given, is called after every flip.
+    screen = pygame.display.get_surface()
+    draw(screen)
+    pygame.display.flip()
+    if presented is not None:
+        presented()
+    pygame.time.set_timer(IDLE_REFRESH, refresh_ms)
+    try:
+        while active():
+            event = pygame.event.wait()
+            if event.type == IDLE_REFRESH:
+                draw(screen)
+                pygame.display.flip()
+                if presented is not None:
+                    presented()
+            else:
+                handle_event(event)
+    finally:
+        # handle_event may have shut pygame down already (e.g. on quit)
+        if pygame.get_init():
+            pygame.time.set_timer(IDLE_REFRESH, 0)
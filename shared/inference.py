@@ -0,0 +1,267 @@
+# shared/inference.py
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from shared.replay import NUM_LANDMARKS, ReplayHand, ReplayResults
+
+# Worker -> game message: frame seq and hand count, followed by
+# count x 21 x (x, y, z) float32 landmarks in normalized coordinates.
+RESULT = struct.Struct("<qB")
+READY = -1  # seq of the message a worker sends once MediaPipe has loaded
+
+# Game -> worker messages are (seq, slot) for a frame written to the ring,
+# RESET to drop tracking state, or None to exit.
+RESET = "reset"
+
+
+def _worker_main(conn, shm_name, shape, slots, max_hands, min_detection_confidence, track_roi):
+    # Entry point of the inference process.
+    import cv2
+    import mediapipe as mp
+    from shared.roi import RoiTracker
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+    hands = mp.solutions.hands.Hands(max_num_hands=max_hands, min_detection_confidence=min_detection_confidence)
+    roi = RoiTracker(hands, max_hands=max_hands) if track_roi else None
+    conn.send_bytes(RESULT.pack(READY, 0))
+    try:
+        while True:
+            # Take everything that queued up while the last frame was processed:
+            # resets apply in order, but only the newest frame is worth processing.
+            messages = [conn.recv()]
+            while conn.poll():
+                messages.append(conn.recv())
+            latest = None
+            for message in messages:
+                if message is None:
+                    return
+                if message == RESET:
+                    hands.reset()
+                    if roi is not None:
+                        roi.reset()
+                else:
+                    latest = message
+            if latest is None:
+                continue
+
+            seq, slot = latest
+            frame = frames[slot]
+            if roi is not None:
+                results = roi.process(frame)
+            else:
+                results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            found = results.multi_hand_landmarks or []
+            points = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in found], dtype=np.float32)
+            conn.send_bytes(RESULT.pack(seq, len(found)) + points.tobytes())
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        hands.close()
+        del frames
+        shm.close()
+
+
+class ProcessDetector:
+    # Drop-in replacement for get_hand_landmarks that runs MediaPipe in a
+    # separate process, so neither inference nor its Python-side pre- and
+    # post-processing competes with the game loop for the GIL.
+    # Frames are copied into a ring of `slots` frame buffers in shared memory
+    # and only (seq, slot) goes through the pipe; results come back as packed
+    # float32 landmark arrays and are returned as the same stand-in objects a
+    # replay uses (shared/replay.py). Calls are pipelined: each one submits
+    # its frame and returns the newest result that has arrived, so the worker
+    # can be busy with one frame while the next is already waiting. With up
+    # to slots - 1 frames in flight, a call first waits for a result; `lag` is
+    # how much earlier than the current call's frame the returned result's
+    # frame was submitted. The worker skips to the newest frame if several are waiting.
+    # If the worker dies, or nothing comes back for max_timeouts waits of
+    # `timeout` seconds in a row once it has loaded, it is restarted. The ring
+    # is sized on the first frame and rebuilt if the frame size changes.
+    # warm_up() starts the worker ahead of time on a blank frame of
+    # frame_shape (rows, columns, 3), the size the camera is expected to deliver.
+    def __init__(self, max_hands=1, min_detection_confidence=0.7, track_roi=False, slots=3,
+                 timeout=1.0, max_timeouts=3, start_timeout=20.0, frame_shape=None):
+        self.max_hands = max_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.track_roi = track_roi
+        self.slots = slots
+        self.timeout = timeout
+        self.max_timeouts = max_timeouts
+        self.start_timeout = start_timeout
+        self.frame_shape = frame_shape
+        self.shape = None
+        self.shm = None
+        self.frames = None
+        self.process = None
+        self.conn = None
+        self.seq = 0
+        self.restarts = 0
+        self.lag = 0.0
+        self._answered = 0  # seq of the newest frame the worker has answered or skipped
+        self._stale = 0  # results up to this seq are from before a reset and dropped
+        self._submitted = {}  # seq -> time.perf_counter() at submission, while in flight
+        self._latest = ReplayResults(None)
+        self._latest_submitted = None
+        self._timeouts = 0
+        self._ready = False
+        self._started_at = 0.0
+        self._closed = False
+        # Spawn rather than fork: the game process already runs threads and SDL.
+        self._context = multiprocessing.get_context("spawn")
+
+    def __call__(self, frame):
+        if self._closed:
+            return ReplayResults(None)
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+        elif not self.process.is_alive():
+            self._restart()
+
+        try:
+            self._receive(0.0)
+            # Keep a slot free for this frame: the worker may be reading any in-flight one.
+            if self.seq - self._answered >= self.slots - 1:
+                self._receive(self._wait_time())
+            if self.seq - self._answered >= self.slots - 1:
+                self._timed_out()
+                return self._latest
+            self.seq += 1
+            self.frames[self.seq % self.slots] = frame
+            self._submitted[self.seq] = time.perf_counter()
+            self.conn.send((self.seq, self.seq % self.slots))
+        except (EOFError, OSError):
+            if not self._closed:
+                self._restart()
+            return self._latest
+        if self._latest_submitted is not None:
+            self.lag = self._submitted[self.seq] - self._latest_submitted
+        return self._latest
+
+    def _wait_time(self):
+        if self._ready:
+            return self.timeout
+        return max(0.0, self._started_at + self.start_timeout - time.perf_counter())
+
+    def _receive(self, wait):
+        # Take in every result that arrives within wait seconds, or only the
+        # ones already waiting if wait is 0; stops at the first result after
+        # waiting. The newest one becomes the result calls return.
+        while self.conn.poll(wait):
+            data = self.conn.recv_bytes()
+            result_seq, count = RESULT.unpack_from(data)
+            if result_seq == READY:
+                self._ready = True
+                continue
+            self._timeouts = 0
+            if result_seq <= self._answered:
+                continue
+            for seq in range(self._answered + 1, result_seq + 1):
+                submitted = self._submitted.pop(seq, None)
+            self._answered = result_seq
+            if result_seq <= self._stale:
+                continue
+            points = np.frombuffer(data, dtype=np.float32, offset=RESULT.size).reshape(count, NUM_LANDMARKS, 3)
+            self._latest = ReplayResults([ReplayHand(hand) for hand in points] or None)
+            self._latest_submitted = submitted
+            wait = 0.0
+
+    def _timed_out(self):
+        # No result came back although the ring is full.
+        if not self._ready:
+            if self._wait_time() <= 0:
+                self._restart()
+            return
+        self._timeouts += 1
+        if self._timeouts >= self.max_timeouts:
+            self._restart()
+
+    def warm_up(self):
+        # Start the worker and wait until it has answered a blank frame.
+        if self.frame_shape is None:
+            return
+        self(np.zeros(self.frame_shape, dtype=np.uint8))
+        target = self.seq
+        while not self._closed and self._answered < target and self.process.is_alive():
+            wait = self._wait_time()
+            if wait <= 0:
+                break
+            try:
+                self._receive(wait)
+            except (EOFError, OSError):
+                break
+        self.reset()
+
+    def reset(self):
+        # Forget tracked hands; applied by the worker before its next frame.
+        # Results for frames submitted before now are dropped.
+        self._stale = self.seq
+        self._latest = ReplayResults(None)
+        self._latest_submitted = None
+        self.lag = 0.0
+        if self.conn is not None and not self._closed:
+            try:
+                self.conn.send(RESET)
+            except OSError:
+                pass
+
+    def _allocate(self, shape):
+        self._stop_worker()
+        self._release_ring()
+        self.shape = shape
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(shape)))
+        self.frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=self.shm.buf)
+        self._start_worker()
+
+    def _start_worker(self):
+        # Frames sent to an earlier worker will never be answered.
+        self._answered = self._stale = self.seq
+        self._submitted.clear()
+        self._latest = ReplayResults(None)
+        self._latest_submitted = None
+        self._timeouts = 0
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_worker_main, name="gesture-worker", daemon=True,
+            args=(child_conn, self.shm.name, self.shape, self.slots, self.max_hands,
+                  self.min_detection_confidence, self.track_roi))
+        self.process.start()
+        child_conn.close()
+        self._ready = False
+        self._started_at = time.perf_counter()
+
+    def _stop_worker(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1.0)
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def _restart(self):
+        self._stop_worker()
+        self.restarts += 1
+        self._start_worker()
+
+    def _release_ring(self):
+        if self.shm is not None:
+            self.frames = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        self._closed = True
+        self._stop_worker()
+        self._release_ring()
@@ -0,0 +1,227 @@
+# shared/pipeline.py
+import threading
+import time
+from collections import namedtuple
+
+from shared.hands import HandTracker, track_hands
+
+# Snapshot of the newest tracking result, as seen by the render loop.
+# hands holds a TrackedHand (shared/hands.py) per hand found, oldest track
+# first; finger_pos and pinch_distance are those of the first one, or None
+# when no hand was found in the frame.
+GestureState = namedtuple(
+    "GestureState",
+    ["frame", "results", "pinch_distance", "finger_pos", "timestamp", "seq", "hands"],
+)
+
+
+class LatestSlot:
+    # Holds only the most recent value published by a single writer thread.
+    # Publishing swaps one reference, which is atomic under the GIL, so readers
+    # never block and never observe a half-written value.
+    def __init__(self):
+        self._value = None
+
+    def publish(self, value):
+        self._value = value
+
+    def read(self):
+        return self._value
+
+
+def camera_opener(index=0, width=None, height=None):
+    # Return a callable that opens (or re-opens) the webcam with the requested size.
+    def open_capture():
+        import cv2  # deferred so that starting a game doesn't wait for OpenCV
+        cap = cv2.VideoCapture(index)
+        if width is not None:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        return cap
+    return open_capture
+
+
+class GesturePipeline:
+    # Runs camera capture and hand tracking on background threads.
+    # The capture thread always keeps the newest frame; the inference thread
+    # processes whichever frame is newest when it becomes free, so slow
+    # inference drops frames instead of building up latency. The game loop
+    # calls latest() once per rendered frame and never waits on either thread.
+    # An optional recorder (shared.replay.LandmarkRecorder) logs every result.
+    # pause() stops capture and inference outside gameplay; the camera is
+    # released once the pipeline has been paused for release_after seconds,
+    # so quick menu round trips don't pay for reopening it. reset, if given,
+    # is called on the inference thread before the first frame after a pause
+    # to drop tracking state that refers to frames from before it.
+    # All hands come from the one detect() call per frame; HandTracker only
+    # matches them to the previous result's hands to keep their IDs stable.
+    # start() returns at once: the camera is opened on the capture thread and
+    # warm_up, if given, runs first thing on the inference thread (typically
+    # loading the model and running it on a blank frame), both even while
+    # paused, so a game can show its menu while they happen. ready_at is the
+    # time.perf_counter() at which both had finished.
+    def __init__(self, open_capture, detect, screen_size, mirror=True, recorder=None,
+                 release_after=5.0, reset=None, warm_up=None):
+        self.open_capture = open_capture
+        self.detect = detect
+        self.screen_size = screen_size  # (width, height) that finger positions are scaled to
+        self.mirror = mirror
+        self.recorder = recorder
+        self.release_after = release_after
+        self.reset = reset
+        self.warm_up = warm_up
+
+        # Results arrive in real time (as opposed to a lockstep replay).
+        self.realtime = True
+
+        self.tracker = HandTracker()
+        self.frames = LatestSlot()
+        self.state = LatestSlot()
+        self.cap = None
+        # Most recent capture and inference durations, for the frame profiler.
+        self.timings = {"capture": 0.0, "inference": 0.0}
+        self._frame_ready = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._paused_at = None
+        self._needs_reset = False
+        self._running = False
+        self._threads = []
+        self._camera_ready_at = None
+        self._model_ready_at = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="gesture-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="gesture-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        self._frame_ready.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        inference_running = any(thread.is_alive() for thread in self._threads)
+        self._threads = []
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.recorder is not None:
+            if not inference_running:
+                self.recorder.close()  # otherwise the inference thread closes it when it exits
+            self.recorder = None
+
+    def pause(self):
+        # Stop reading and processing frames; latest() returns None until resume().
+        if self._paused_at is None:
+            self._paused_at = time.perf_counter()
+            self._needs_reset = True
+            self._resumed.clear()
+        self.frames.publish(None)
+        self.state.publish(None)
+
+    def resume(self):
+        # Carry on after pause(); the camera is reopened on the capture thread if it was released.
+        self._paused_at = None
+        self._resumed.set()
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    @property
+    def ready_at(self):
+        # When the camera had delivered a frame and warm-up had finished, or None until then.
+        if self._camera_ready_at is None or self._model_ready_at is None:
+            return None
+        return max(self._camera_ready_at, self._model_ready_at)
+
+    def latest(self):
+        # Non-blocking: returns the newest GestureState, or None before the first result.
+        return self.state.read()
+
+    def _capture_loop(self):
+        import cv2
+
+        # Open the camera and read one frame straight away, even if paused:
+        # opening it can take seconds, and games start out in their menu.
+        self.cap = self.open_capture()
+        opened_at = time.perf_counter()
+        if self.cap.read()[0]:
+            self._camera_ready_at = time.perf_counter()
+        seq = 0
+        while self._running:
+            paused_at = self._paused_at
+            if paused_at is not None:
+                idle = time.perf_counter() - max(paused_at, opened_at)
+                if self.cap is not None and idle >= self.release_after:
+                    self.cap.release()
+                    self.cap = None
+                self._resumed.wait(0.25)
+                continue
+            if self.cap is None:
+                self.cap = self.open_capture()
+                opened_at = time.perf_counter()
+            started = time.perf_counter()
+            ret, frame = self.cap.read()
+            self.timings["capture"] = time.perf_counter() - started
+            if not ret:
+                # Dropped camera frame: try again shortly, rendering carries on regardless.
+                time.sleep(0.005)
+                continue
+            if self._camera_ready_at is None:
+                self._camera_ready_at = time.perf_counter()
+            if self.mirror:
+                frame = cv2.flip(frame, 1)
+            seq += 1
+            self.frames.publish((seq, frame, time.perf_counter()))
+            self._frame_ready.set()
+
+    def _inference_loop(self):
+        # The recorder is closed here, on the way out, so stop() can't close it
+        # while a slow detect() call is still about to write a result.
+        recorder = self.recorder
+        try:
+            self._process_frames(recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    def _process_frames(self, recorder):
+        if self.warm_up is not None:
+            self.warm_up()
+        self._model_ready_at = time.perf_counter()
+        last_seq = 0
+        while self._running:
+            self._frame_ready.wait(0.1)
+            self._frame_ready.clear()
+            item = self.frames.read()
+            if item is None or item[0] == last_seq:
+                continue
+            seq, frame, captured_at = item
+            last_seq = seq
+            if self._needs_reset:
+                self._needs_reset = False
+                self.tracker.reset()
+                if self.reset is not None:
+                    self.reset()
+
+            started = time.perf_counter()
+            results = self.detect(frame)
+            self.timings["inference"] = time.perf_counter() - started
+            # A pipelined detector (ProcessDetector) may answer for a frame it
+            # was given lag seconds before this one.
+            captured_at -= getattr(self.detect, "lag", 0.0)
+            hands = track_hands(self.tracker, results, self.screen_size)
+            pinch_distance, finger_pos = (hands[0].pinch_distance, hands[0].finger_pos) if hands else (None, None)
+            if recorder is not None:
+                recorder.write(captured_at, [hand.features.points for hand in hands], pinch_distance)
+            if self.paused:
+                continue  # don't publish a result from before the pause
+            self.state.publish(GestureState(frame, results, pinch_distance, finger_pos, captured_at, seq, hands))
@@ -0,0 +1,82 @@
+# shared/pool.py
+import pygame
+
+# Images shared by every sprite of a type, keyed by a name chosen by the caller.
+_images = {}
+
+
+def shared_image(key, build):
+    # Return the cached image for key, calling build() to render it the first time.
+    # Callers must treat the returned surface as read-only.
+    image = _images.get(key)
+    if image is None:
+        image = _images[key] = build()
+    return image
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    # Sprite that goes back to its pool when killed instead of being discarded.
+    # Subclasses must define reset(*args), which SpritePool.acquire() calls to
+    # reinitialize a recycled instance with the same arguments their
+    # constructor takes.
+    pool = None
+    pooled = False
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    # Free list of recycled sprites.
+    # acquire() hands out a free sprite after reset(), or builds a new one
+    # with factory() when the free list is empty; killing the sprite returns it.
+    def __init__(self, factory, max_free=1024):
+        self.factory = factory
+        self.max_free = max_free
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.factory(*args)
+            sprite.pool = self
+            self.created += 1
+        sprite.pooled = False
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return sprite
+
+    def release(self, sprite):
+        # Ignore repeated kills of a sprite that is already back in the pool.
+        if sprite.pooled:
+            return
+        sprite.pooled = True
+        self.in_use -= 1
+        self.released += 1
+        if len(self.free) < self.max_free:
+            self.free.append(sprite)
+
+    def release_all(self, group):
+        # Kill every sprite in a group, returning pooled ones (use instead of group.empty()).
+        for sprite in group.sprites():
+            sprite.kill()
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "released": self.released,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "free": len(self.free),
+        }
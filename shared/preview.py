@@ -0,0 +1,69 @@
+# shared/preview.py
+import time
+
+import numpy as np
+import pygame
+
+from shared.gestures import hand_points
+
+# MediaPipe's 21-point hand skeleton (the pairs in mp_hands.HAND_CONNECTIONS).
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+LINE_COLOR = (255, 255, 255)
+POINT_COLOR = (255, 0, 0)
+
+
+class PreviewRenderer:
+    # Camera thumbnail that reuses the same buffers every update.
+    # The BGR frame is downsized with OpenCV into a preallocated array first,
+    # then copied channel-swapped straight into a persistent surface through
+    # pixels3d, so no full-resolution copies or new surfaces are made. The
+    # hand skeleton is drawn on the thumbnail itself. Updates are throttled
+    # to `fps`, which can be lower than the game's frame rate.
+    def __init__(self, size, fps=15):
+        self.size = size
+        self.interval = 1.0 / fps if fps else 0.0
+        width, height = size
+        self.surface = pygame.Surface(size)
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._last_update = 0.0
+        self._last_seq = None
+
+    def update(self, frame, hand_landmarks=None, seq=None):
+        # Refresh the thumbnail if the frame is new and the update interval has passed.
+        # Returns True when the surface changed.
+        now = time.perf_counter()
+        if now - self._last_update < self.interval:
+            return False
+        if seq is not None and seq == self._last_seq:
+            return False
+        self._last_update = now
+        self._last_seq = seq
+
+        import cv2  # deferred so that startup doesn't wait for OpenCV
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        # surfarray is indexed [x, y] and the frame is BGR: transpose and reverse channels as views.
+        pixels[...] = self._small.swapaxes(0, 1)[:, :, ::-1]
+        del pixels  # release the surface lock before drawing on it
+
+        if hand_landmarks:
+            for hand in hand_landmarks:
+                self.draw_hand(hand)
+        return True
+
+    def draw_hand(self, hand):
+        points = (hand_points(hand)[:, :2] * self.size).astype(np.int32).tolist()
+        for a, b in HAND_CONNECTIONS:
+            pygame.draw.line(self.surface, LINE_COLOR, points[a], points[b], 1)
+        for point in points:
+            pygame.draw.circle(self.surface, POINT_COLOR, point, 2)
+
+    def draw(self, screen, pos):
+        screen.blit(self.surface, pos)
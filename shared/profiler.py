@@ -0,0 +1,145 @@
+# shared/profiler.py
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+import pygame
+
+OVERLAY_KEY = pygame.K_F3
+FRAME_BUDGET = 1.0 / 60
+BAR_WIDTH = 120
+
+
+def add_profiler_arguments(parser):
+    parser.add_argument("--profile", action="store_true", help="collect per-stage frame timings (F3 shows them)")
+    parser.add_argument("--profile-out", metavar="PATH", help="stream per-frame stage timings to PATH as JSON lines")
+
+
+class TimingExporter:
+    # Writes one JSON line per frame from a background thread. The queue is
+    # bounded: if the disk falls behind, frames are dropped (and counted)
+    # instead of stalling the game loop.
+    def __init__(self, path, max_pending=1024):
+        self.file = open(path, "w")
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._write_loop, name="profile-export", daemon=True)
+        self.thread.start()
+
+    def put(self, record):
+        try:
+            self.pending.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            record = self.pending.get()
+            if record is None:
+                break
+            self.file.write(json.dumps(record) + "\n")
+        self.file.close()
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join(timeout=2.0)
+
+
+class FrameProfiler:
+    # Per-stage frame timer.
+    # The game loop calls begin_frame(), then mark(stage) as each stage ends,
+    # then end_frame(). Each mark records the time since the previous one.
+    # Work done on other threads (camera capture, inference) is reported with
+    # add(). While disabled, every call returns immediately.
+    def __init__(self, enabled=False, export_path=None, history=240):
+        self.enabled = enabled or export_path is not None
+        self.show_overlay = False
+        self.history = history
+        self.samples = {}
+        self.frame = 0
+        self.exporter = TimingExporter(export_path) if export_path else None
+        self.font = None
+        self._current = {}
+        self._last = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[stage] = now - self._last
+        self._last = now
+
+    def add(self, stage, seconds):
+        if not self.enabled:
+            return
+        self._current[stage] = seconds
+
+    def add_pipeline(self, pipeline):
+        # Latest capture and inference durations measured on the pipeline threads.
+        if not self.enabled:
+            return
+        for stage, seconds in pipeline.timings.items():
+            self._current[stage] = seconds
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame += 1
+        for stage, seconds in self._current.items():
+            history = self.samples.get(stage)
+            if history is None:
+                history = self.samples[stage] = deque(maxlen=self.history)
+            history.append(seconds)
+        if self.exporter is not None:
+            record = {stage: round(seconds * 1000.0, 3) for stage, seconds in self._current.items()}
+            record["frame"] = self.frame
+            record["t"] = round(time.time(), 4)
+            self.exporter.put(record)
+
+    def handle_event(self, event):
+        # Toggle the overlay with the hotkey; this also turns collection on.
+        if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+            self.show_overlay = not self.show_overlay
+            if self.show_overlay:
+                self.enabled = True
+
+    def stats(self, stage):
+        # (p50, p95, max) in milliseconds over the rolling window.
+        values = sorted(self.samples[stage])
+        n = len(values)
+        return (values[n // 2] * 1000.0, values[min(n - 1, int(n * 0.95))] * 1000.0, values[-1] * 1000.0)
+
+    def draw(self, surface, pos=(10, 80)):
+        if not self.show_overlay or not self.samples:
+            return
+        if self.font is None:
+            self.font = pygame.font.SysFont("Arial", 14)
+        x, y = pos
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((BAR_WIDTH + 250, line_height * (len(self.samples) + 1) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        surface.blit(panel, (x - 4, y - 4))
+        header = self.font.render("stage        p50     p95     max (ms)", True, (255, 255, 255))
+        surface.blit(header, (x, y))
+        for stage in self.samples:
+            y += line_height
+            p50, p95, worst = self.stats(stage)
+            text = self.font.render(f"{stage:<12}{p50:>6.2f}  {p95:>6.2f}  {worst:>6.2f}", True, (255, 255, 255))
+            surface.blit(text, (x, y))
+            # Bar shows p95 against the 60 FPS frame budget; red once it exceeds it.
+            width = int(min(1.0, p95 / (FRAME_BUDGET * 1000.0)) * BAR_WIDTH)
+            color = (220, 60, 60) if p95 > FRAME_BUDGET * 1000.0 else (60, 200, 90)
+            pygame.draw.rect(surface, color, (x + 240, y + 3, max(1, width), line_height - 6))
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
@@ -0,0 +1,236 @@
+# shared/replay.py
+import random
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from shared.hands import HandTracker, track_hands
+from shared.pipeline import GestureState
+
+# File layout: a header, then one record per processed camera frame.
+#   header: magic, format version
+#   record: timestamp (s since the first record), flags, hand count, pinch distance,
+#           then hand count x 21 x (x, y, z) float32 landmarks in normalized coordinates
+MAGIC = b"HLMK"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<dBBf")
+NUM_LANDMARKS = 21
+HAND_BYTES = NUM_LANDMARKS * 3 * 4
+
+FLAG_PINCH = 1
+PINCH_THRESHOLD = 0.05
+
+# Stand-ins for MediaPipe's result objects. They expose the attributes the
+# games read (results.multi_hand_landmarks, hand.landmark, lm.x/.y/.z), so
+# code written against MediaPipe works on replayed data unchanged.
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+ReplayResults = namedtuple("ReplayResults", ["multi_hand_landmarks"])
+
+
+class ReplayHand:
+    # One hand backed by a (21, 3) landmark array, which shared.gestures reads
+    # directly; the list of Landmark tuples is only built if something asks
+    # for hand.landmark.
+    __slots__ = ("points", "_landmark")
+
+    def __init__(self, points):
+        self.points = points
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        if self._landmark is None:
+            self._landmark = [Landmark(*p) for p in self.points.tolist()]
+        return self._landmark
+
+# One decoded record; hands is a list of (21, 3) float32 arrays.
+Record = namedtuple("Record", ["timestamp", "pinch", "pinch_distance", "hands"])
+
+
+def add_input_arguments(parser):
+    # Command-line switches shared by the three games.
+    parser.add_argument("--record", metavar="PATH", help="record hand landmarks to PATH while playing")
+    parser.add_argument("--replay", metavar="PATH", help="replay recorded landmarks instead of using the webcam")
+    parser.add_argument("--fast", action="store_true",
+                        help="with --replay: replay one record per frame, as fast as possible, with a fixed "
+                             "frame time, so every run plays out the same")
+    parser.add_argument("--seed", type=int,
+                        help="seed the game's random numbers (a --fast replay uses 0 unless given)")
+    parser.add_argument("--inference-process", action="store_true",
+                        help="run hand tracking in a separate process (see shared/inference.py)")
+
+
+def lockstep(args):
+    # True for a --fast replay: the game runs unthrottled on LockstepClock.
+    return bool(args.replay) and args.fast
+
+
+def seed_random(args):
+    # Seed the random module from --seed, or with 0 for a --fast replay so
+    # that spawns and layouts repeat exactly from run to run.
+    seed = args.seed
+    if seed is None and lockstep(args):
+        seed = 0
+    if seed is not None:
+        random.seed(seed)
+
+
+class LockstepClock:
+    # Stands in for pygame.time.Clock in a --fast replay: never sleeps and
+    # always reports a frame of frame_ms, so the game advances by the same
+    # step for every replayed record regardless of how fast it renders.
+    def __init__(self, frame_ms=1000 / 60):
+        self.frame_ms = frame_ms
+
+    def tick(self, framerate=0):
+        return self.frame_ms
+
+    def get_fps(self):
+        return 1000 / self.frame_ms
+
+
+class LandmarkRecorder:
+    # Appends one record per tracking result. Only ever written from the inference thread.
+    # write() takes the (21, 3) landmark array of each hand in the result.
+    def __init__(self, path, pinch_threshold=PINCH_THRESHOLD):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.pinch_threshold = pinch_threshold
+        self.start = None
+
+    def write(self, timestamp, hands, pinch_distance):
+        if self.start is None:
+            self.start = timestamp
+        pinch = pinch_distance is not None and pinch_distance < self.pinch_threshold
+        self.file.write(RECORD.pack(timestamp - self.start, FLAG_PINCH if pinch else 0, len(hands),
+                                    pinch_distance if pinch_distance is not None else -1.0))
+        for points in hands:
+            self.file.write(np.asarray(points, dtype=np.float32).tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+def read_recording(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    if version != VERSION:
+        raise ValueError(f"{path} uses unsupported recording version {version}")
+
+    # A session that crashed or was killed can end in a partial record; stop
+    # at the last complete one rather than losing the whole recording.
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        timestamp, flags, count, pinch_distance = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + count * HAND_BYTES > len(data):
+            break
+        hands = []
+        for _ in range(count):
+            hands.append(np.frombuffer(data, dtype=np.float32, count=NUM_LANDMARKS * 3,
+                                       offset=offset).reshape(NUM_LANDMARKS, 3))
+            offset += HAND_BYTES
+        records.append(Record(timestamp, bool(flags & FLAG_PINCH),
+                              pinch_distance if pinch_distance >= 0 else None, hands))
+    return records
+
+
+def to_results(record):
+    hands = [ReplayHand(points) for points in record.hands]
+    return ReplayResults(hands or None)
+
+
+class ReplayPipeline:
+    # Drop-in replacement for GesturePipeline that plays back a recording.
+    # In real-time mode latest() returns the record due at the current time;
+    # otherwise every call to latest() advances exactly one record, so a run
+    # sees the same input on the same frame every time.
+    def __init__(self, path, screen_size, realtime=True, loop=False, frame_size=(640, 480)):
+        self.records = read_recording(path)
+        self.screen_size = screen_size
+        self.realtime = realtime
+        self.loop = loop
+        width, height = frame_size
+        # Blank "camera" frame so the preview still shows the replayed skeleton.
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        # Hand IDs are assigned on playback exactly as they are live.
+        self.tracker = HandTracker()
+        self.index = -1
+        self.started_at = None
+        self.ready_at = None  # nothing to load: ready as soon as started
+        self.finished = False
+        self._state = None
+        self._paused_at = None
+        # Nothing runs in the background during replay.
+        self.timings = {}
+
+    def start(self):
+        if self.started_at is None:
+            self.started_at = self.ready_at = time.perf_counter()
+
+    def stop(self):
+        pass
+
+    def pause(self):
+        # Stop the replay clock; playback continues where it left off on resume().
+        if self._paused_at is None:
+            self._paused_at = time.perf_counter()
+
+    def resume(self):
+        if self._paused_at is not None:
+            if self.started_at is not None:
+                self.started_at += time.perf_counter() - self._paused_at
+            self._paused_at = None
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    def rewind(self):
+        self.index = -1
+        self.started_at = time.perf_counter()
+        self.finished = False
+        self._state = None
+        self.tracker.reset()
+
+    def _target_index(self):
+        if not self.realtime:
+            return self.index + 1
+        if self.index == len(self.records) - 1:
+            # The last record has already been delivered.
+            return len(self.records)
+        elapsed = time.perf_counter() - self.started_at
+        index = self.index
+        while index + 1 < len(self.records) and self.records[index + 1].timestamp <= elapsed:
+            index += 1
+        return index
+
+    def latest(self):
+        if self.started_at is None or not self.records or self._paused_at is not None:
+            return None
+        index = self._target_index()
+        if index >= len(self.records):
+            if not self.loop:
+                self.finished = True
+                return self._state
+            self.rewind()
+            index = 0
+        if index != self.index:
+            self.index = index
+            self._state = self._make_state(index)
+        return self._state
+
+    def _make_state(self, index):
+        record = self.records[index]
+        results = to_results(record)
+        hands = track_hands(self.tracker, results, self.screen_size)
+        pinch_distance, finger_pos = (hands[0].pinch_distance, hands[0].finger_pos) if hands else (None, None)
+        return GestureState(self.frame, results, pinch_distance, finger_pos, self.started_at + record.timestamp,
+                            index + 1, hands)
@@ -0,0 +1,75 @@
+# shared/roi.py
+
+
+class RoiTracker:
+    # Region-of-interest hand tracking.
+    # Once a hand has been found, only a square crop around its previous
+    # bounding box is converted and passed to MediaPipe, downsized to
+    # input_size x input_size. A full-frame search only runs while no hand is
+    # being tracked. Landmarks are always returned in full-frame normalized
+    # coordinates, so callers cannot tell which path produced them.
+    # With max_hands > 1 the crop covers every tracked hand, and the full frame
+    # is searched while fewer than max_hands are tracked, since a hand that
+    # has not been found yet may be anywhere.
+    def __init__(self, hands, input_size=256, margin=0.5, min_size=96, max_hands=1):
+        self.hands = hands
+        self.max_hands = max_hands
+        self.input_size = input_size
+        self.margin = margin      # padding around the hand, as a fraction of its size
+        self.min_size = min_size  # smallest crop side in full-frame pixels
+        self.roi = None           # (x, y, side) of the current crop in full-frame pixels
+
+    def reset(self):
+        self.roi = None
+
+    def process(self, frame):
+        import cv2  # deferred: loaded on the inference thread, not at startup
+        height, width = frame.shape[:2]
+        if self.roi is not None:
+            x, y, side = self.roi
+            crop = frame[y:y + side, x:x + side]
+            crop = cv2.resize(crop, (self.input_size, self.input_size), interpolation=cv2.INTER_AREA)
+            results = self.hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                self._map_to_frame(results, x, y, side, width, height)
+                self._update_roi(results, width, height)
+                return results
+            # Hands lost: fall back to searching the whole frame.
+            self.roi = None
+
+        results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            self._update_roi(results, width, height)
+        return results
+
+    def _map_to_frame(self, results, x, y, side, width, height):
+        # Landmarks are normalized to the crop; rescale them in place to the full frame.
+        sx, sy = side / width, side / height
+        ox, oy = x / width, y / height
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                # MediaPipe scales z like x, relative to the image width.
+                lm.z = lm.z * sx
+
+    def _update_roi(self, results, width, height):
+        # Crop around the bounding box of all tracked hands.
+        if len(results.multi_hand_landmarks) < self.max_hands:
+            self.roi = None
+            return
+        xs = [lm.x * width for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y * height for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        cx = (min(xs) + max(xs)) / 2
+        cy = (min(ys) + max(ys)) / 2
+        size = max(max(xs) - min(xs), max(ys) - min(ys))
+        side = int(max(self.min_size, size * (1 + 2 * self.margin)))
+        if side >= min(width, height):
+            # The hands fill most of the frame; cropping would not save anything.
+            self.roi = None
+            return
+        # Keep the crop square (constant input size for MediaPipe's tracker) by
+        # sliding it back inside the frame rather than shrinking it.
+        x = int(min(max(cx - side / 2, 0), width - side))
+        y = int(min(max(cy - side / 2, 0), height - side))
+        self.roi = (x, y, side)
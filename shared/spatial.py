@@ -0,0 +1,180 @@
+# shared/spatial.py
+import bisect
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+
+class SpatialGrid:
+    # Uniform-grid broadphase for sprites with a .rect.
+    # Each sprite is bucketed into every cell its rect overlaps, so a query only
+    # looks at sprites in the cells it touches instead of the whole group.
+    # There are two ways to fill it:
+    #   rebuild(sprites), once per tick, for sprites that all move every tick.
+    #     The rects are read into one array and every sprite's cells are
+    #     computed with NumPy. The (cell, sprite) pairs are sorted by cell, so
+    #     a query finds each column of cells it touches with a binary search
+    #     (bisect on plain lists, which beats a NumPy call for a few cells).
+    #     remove() only marks a sprite as gone until the next rebuild().
+    #   insert(), move() and remove() keep a dict of cells up to date one
+    #     sprite at a time, for sprites that rarely move.
+    # The two don't mix: insert() and move() raise after rebuild() until the
+    # grid is cleared.
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self._sprite_cells = {}
+        # Filled by rebuild(): the sprites, the sorted cell keys of their
+        # (cell, sprite) pairs and the sprite index of each pair.
+        self._sprites = None
+        self._keys = None
+        self._members = None
+        self._removed = set()
+
+    def __len__(self):
+        if self._sprites is not None:
+            return len(self._sprites) - len(self._removed)
+        return len(self._sprite_cells)
+
+    def _keys_for_rect(self, rect):
+        cs = self.cell_size
+        x0, y0 = rect.left // cs, rect.top // cs
+        x1, y1 = (rect.right - 1) // cs, (rect.bottom - 1) // cs
+        return tuple((cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1))
+
+    def clear(self):
+        self.cells.clear()
+        self._sprite_cells.clear()
+        self._sprites = None
+        self._keys = None
+        self._members = None
+        self._removed.clear()
+
+    def rebuild(self, sprites):
+        # Replace the contents with sprites. Their rects must not change before
+        # the next rebuild().
+        self.clear()
+        sprites = list(sprites)
+        count = len(sprites)
+        rects = np.fromiter(itertools.chain.from_iterable([sprite.rect for sprite in sprites]),
+                            dtype=np.int64, count=4 * count).reshape(count, 4)
+        cs = self.cell_size
+        x0, y0 = rects[:, 0] // cs, rects[:, 1] // cs
+        columns = (rects[:, 0] + rects[:, 2] - 1) // cs - x0 + 1
+        rows = (rects[:, 1] + rects[:, 3] - 1) // cs - y0 + 1
+        keys, members = [], []
+        for dx in range(int(columns.max(initial=0))):
+            for dy in range(int(rows.max(initial=0))):
+                index = np.flatnonzero((dx < columns) & (dy < rows))
+                keys.append(_cell_keys(x0[index] + dx, y0[index] + dy))
+                members.append(index)
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        members = np.concatenate(members) if members else np.zeros(0, dtype=np.int64)
+        order = np.argsort(keys)
+        self._sprites = sprites
+        self._keys = keys[order].tolist()
+        self._members = members[order].tolist()
+
+    def _rebuilt_candidates(self, x0, y0, x1, y1):
+        # Rebuilt sprites in cells x0..x1 by y0..y1, each once, in rebuild() order.
+        # Keys sort by column, then row, so each column's cells are one run.
+        keys, members = self._keys, self._members
+        found = []
+        for cx in range(x0, x1 + 1):
+            column = cx << 32
+            start = bisect.bisect_left(keys, column + y0 + (1 << 31))
+            end = bisect.bisect_right(keys, column + y1 + (1 << 31), start)
+            found += members[start:end]
+        if len(found) > 1:
+            found = sorted(set(found))
+        sprites, removed = self._sprites, self._removed
+        return [sprites[i] for i in found if sprites[i] not in removed]
+
+    def _check_incremental(self):
+        if self._sprites is not None:
+            raise RuntimeError("SpatialGrid: insert() and move() can't follow rebuild() until clear()")
+
+    def insert(self, sprite):
+        self._check_incremental()
+        keys = self._keys_for_rect(sprite.rect)
+        self._sprite_cells[sprite] = keys
+        for key in keys:
+            self.cells[key].append(sprite)
+
+    def remove(self, sprite):
+        if self._sprites is not None:
+            self._removed.add(sprite)
+            return
+        keys = self._sprite_cells.pop(sprite, None)
+        if keys is None:
+            return
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(sprite)
+            if not bucket:
+                del self.cells[key]
+
+    def move(self, sprite):
+        # Re-bucket a sprite after its rect changed; a no-op if it stayed in the same cells.
+        self._check_incremental()
+        keys = self._keys_for_rect(sprite.rect)
+        if self._sprite_cells.get(sprite) == keys:
+            return
+        self.remove(sprite)
+        self._sprite_cells[sprite] = keys
+        for key in keys:
+            self.cells[key].append(sprite)
+
+    def _candidates(self, keys):
+        seen = set()
+        for key in keys:
+            for sprite in self.cells.get(key, ()):
+                if sprite not in seen:
+                    seen.add(sprite)
+                    yield sprite
+
+    def query_rect(self, rect):
+        # Sprites whose rect overlaps the given rect.
+        if self._sprites is not None:
+            cs = self.cell_size
+            candidates = self._rebuilt_candidates(rect.left // cs, rect.top // cs,
+                                                  (rect.right - 1) // cs, (rect.bottom - 1) // cs)
+            return [s for s in candidates if s.rect.colliderect(rect)]
+        return [s for s in self._candidates(self._keys_for_rect(rect)) if s.rect.colliderect(rect)]
+
+    def query_point(self, point):
+        # Sprites whose rect contains the given point.
+        cs = self.cell_size
+        cx, cy = int(point[0]) // cs, int(point[1]) // cs
+        if self._sprites is not None:
+            candidates = self._rebuilt_candidates(cx, cy, cx, cy)
+        else:
+            candidates = self.cells.get((cx, cy), ())
+        return [s for s in candidates if s.rect.collidepoint(point)]
+
+    def query_radius(self, center, radius):
+        # Sprites whose rect comes within radius of the given point.
+        cx, cy = center
+        cs = self.cell_size
+        x0, y0 = int(cx - radius) // cs, int(cy - radius) // cs
+        x1, y1 = int(cx + radius) // cs, int(cy + radius) // cs
+        if self._sprites is not None:
+            candidates = self._rebuilt_candidates(x0, y0, x1, y1)
+        else:
+            candidates = self._candidates([(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)])
+        radius_sq = radius * radius
+        hits = []
+        for sprite in candidates:
+            rect = sprite.rect
+            # Distance from the center to the closest point of the rect.
+            dx = max(rect.left - cx, 0, cx - rect.right)
+            dy = max(rect.top - cy, 0, cy - rect.bottom)
+            if dx * dx + dy * dy <= radius_sq:
+                hits.append(sprite)
+        return hits
+
+
+def _cell_keys(cx, cy):
+    # One sortable int64 per cell: column in the high 32 bits, row in the low.
+    return (np.asarray(cx, dtype=np.int64) << 32) + (np.asarray(cy, dtype=np.int64) + (1 << 31))
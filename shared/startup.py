@@ -0,0 +1,66 @@
+# shared/startup.py
+import time
+
+# Startup times are measured from when a game first imported this module.
+LAUNCHED_AT = time.perf_counter()
+
+
+class LazyHands:
+    # MediaPipe Hands, created on first use.
+    # Importing mediapipe and building its graph take a second or more, and
+    # the first process() call pays for more setup on top. Games create this
+    # instead of a Hands instance at import time and hand warm_up() to the
+    # GesturePipeline, which runs it on its inference thread while the menu
+    # is up. Takes the same keyword arguments as mp.solutions.hands.Hands.
+    def __init__(self, **options):
+        self.options = options
+        self._hands = None
+
+    def get(self):
+        if self._hands is None:
+            import mediapipe as mp
+            self._hands = mp.solutions.hands.Hands(**self.options)
+        return self._hands
+
+    def process(self, image):
+        return self.get().process(image)
+
+    def reset(self):
+        if self._hands is not None:
+            self._hands.reset()
+
+    def close(self):
+        if self._hands is not None:
+            self._hands.close()
+            self._hands = None
+
+    def warm_up(self, size=(256, 256)):
+        # Load the model and run it once on a blank RGB image.
+        import numpy as np
+        width, height = size
+        self.get().process(np.zeros((height, width, 3), dtype=np.uint8))
+        self.reset()
+
+
+class StartupReport:
+    # Time from launch to the first frame on screen and to hand tracking
+    # being ready (the pipeline's ready_at), printed once both are known.
+    # Call presented() after every display flip until then.
+    def __init__(self, pipeline, launched_at=LAUNCHED_AT):
+        self.pipeline = pipeline
+        self.launched_at = launched_at
+        self.first_frame = None
+        self.tracking_ready = None
+        self.reported = False
+
+    def presented(self):
+        if self.reported:
+            return
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.launched_at
+        ready_at = self.pipeline.ready_at
+        if ready_at is not None:
+            self.tracking_ready = ready_at - self.launched_at
+            self.reported = True
+            print(f"Startup: first frame after {self.first_frame:.2f} s, "
+                  f"hand tracking ready after {self.tracking_ready:.2f} s")
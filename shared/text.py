@@ -0,0 +1,38 @@
+# shared/text.py
+from collections import OrderedDict
+
+
+class TextCache:
+    # LRU cache of rendered text surfaces.
+    # Keyed on (font, text, antialias, color), so titles and instructions are
+    # rasterized once and a HUD value is only re-rendered when it changes.
+    # The least recently used surface is evicted once max_entries is reached.
+    # Returned surfaces are shared: blit them, don't draw on them.
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def render(self, font, text, antialias, color):
+        # Same arguments as font.render(text, antialias, color), plus the font.
+        key = (font, text, antialias, tuple(color))
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.entries[key] = font.render(text, antialias, color)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}